@@ -0,0 +1,14 @@
+from typing import AsyncGenerator
+
+from utils.admission import hash_admission
+
+
+async def admit_hash() -> AsyncGenerator[None, None]:
+    """Admit a request that hashes a password.
+
+    Yields:
+        Nothing, the slot is held until the request is handled.
+
+    """
+    async with hash_admission.admit():
+        yield
@@ -1,15 +1,20 @@
+import hmac
 from typing import Annotated, Awaitable, Callable
 
 from fastapi import Depends
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi.security import APIKeyHeader, HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.dependencies import db
-from api.schemas import UserResponseSchema
-from enums import ActionEnum, ResourceEnum
+from api.schemas import PrincipalSchema, UserResponseSchema
+from db.sessions import release
+from enums import ActionEnum, ResourceEnum, RoleEnum
+from exceptions import AuthCredentialsError, AuthPermissionsError
+from settings import auth_settings
 from usecases import AuthUsecase
 
 security = HTTPBearer()
+service_key_header = APIKeyHeader(name="X-Service-Key", auto_error=False)
 
 
 def get_current_user(
@@ -17,6 +22,8 @@ def get_current_user(
 ) -> Callable[..., Awaitable[UserResponseSchema]]:
     """Get the user and check permissions.
 
+    The connection of the session is returned to the pool before the handler runs.
+
     Dependencies:
         action: The action.
         resource: The resource.
@@ -32,20 +39,88 @@ def get_current_user(
         credentials: Annotated[
             HTTPAuthorizationCredentials, Depends(dependency=security)
         ],
-        session: Annotated[AsyncSession, Depends(dependency=db.get_session)],
+        session: Annotated[AsyncSession, Depends(dependency=db.get_read_session)],
     ) -> UserResponseSchema:
-        return UserResponseSchema.model_validate(
-            await AuthUsecase().get_current_user(
+        user = await AuthUsecase().get_current_user(
+            token=credentials.credentials,
+            session=session,
+            action=action,
+            resource=resource,
+        )
+        await release(session=session)
+
+        return UserResponseSchema.model_validate(user)
+
+    return _dependency
+
+
+def get_current_principal(
+    action: ActionEnum,
+    resource: ResourceEnum,
+    roles: list[RoleEnum] | None = None,
+) -> Callable[..., Awaitable[PrincipalSchema]]:
+    """Get the id, email and role of the user and check permissions.
+
+    The connection of the session is returned to the pool before the handler runs.
+
+    Dependencies:
+        action: The action.
+        resource: The resource.
+        roles: The roles allowed to call the action, all roles if None.
+        credentials: The credentials.
+        session: The session.
+
+    Returns:
+        The principal.
+
+    Raises:
+        AuthPermissionsError: If the role of the user is not allowed.
+
+    """
+
+    async def _dependency(
+        credentials: Annotated[
+            HTTPAuthorizationCredentials, Depends(dependency=security)
+        ],
+        session: Annotated[AsyncSession, Depends(dependency=db.get_read_session)],
+    ) -> PrincipalSchema:
+        principal = PrincipalSchema.model_validate(
+            await AuthUsecase().get_principal(
                 token=credentials.credentials,
                 session=session,
                 action=action,
                 resource=resource,
             )
         )
+        await release(session=session)
+
+        if roles is not None and principal.role not in roles:
+            raise AuthPermissionsError
+
+        return principal
 
     return _dependency
 
 
+async def verify_service(
+    key: Annotated[str | None, Depends(dependency=service_key_header)],
+) -> None:
+    """Check the key of a service calling an internal endpoint.
+
+    Dependencies:
+        key: The service key.
+
+    Raises:
+        AuthCredentialsError: If the key is missing or unknown.
+
+    """
+    if key is None or not any(
+        hmac.compare_digest(key.encode(), service_key.encode())
+        for service_key in auth_settings.service_keys
+    ):
+        raise AuthCredentialsError(message="Invalid service key")
+
+
 def get_auth_usecase() -> AuthUsecase:
     """Get the user auth usecase.
 
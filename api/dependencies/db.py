@@ -2,7 +2,7 @@ from typing import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.sessions import async_session
+from db.sessions import SessionFactory, async_session, read_session
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
@@ -14,3 +14,27 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """
     async with async_session() as session:
         yield session
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Get a session on a read replica, or on the primary if none is in rotation.
+
+    Only for reads that tolerate the replica lag, writes and reads right after a
+    write use the primary session.
+
+    Yields:
+        The session.
+
+    """
+    async with read_session() as session:
+        yield session
+
+
+def get_read_session_maker() -> SessionFactory:
+    """Get the read session factory, for reads that outlive the request handler.
+
+    Returns:
+        The session factory.
+
+    """
+    return read_session
@@ -0,0 +1,114 @@
+import ipaddress
+from typing import Awaitable, Callable
+
+from fastapi import Request
+
+from exceptions import TooManyRequestsError
+from settings import rate_limit_settings
+from utils.redis import RATE_LIMIT_KEY, hit_rate_limits
+
+
+async def _get_email(request: Request) -> str | None:
+    """Get the email from the path, or from the already parsed JSON body.
+
+    Args:
+        request: The request.
+
+    Returns:
+        The email.
+
+    """
+    email = request.path_params.get("email")
+
+    if email is None and request.headers.get("content-type", "").startswith(
+        "application/json"
+    ):
+        body = await request.json()
+        if isinstance(body, dict):
+            email = body.get("email")
+
+    return email.lower() if isinstance(email, str) else None
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+
+    return any(address in network for network in rate_limit_settings.trusted_proxies)
+
+
+def _get_client_ip(request: Request) -> str:
+    """Get the client ip, behind trusted proxies from the client ip header.
+
+    Every proxy appends the address it received the request from, so the header is
+    walked from the right and the first address that is not a trusted proxy is the
+    client. Entries left of it may be forged by the client and are ignored.
+
+    Args:
+        request: The request.
+
+    Returns:
+        The client ip.
+
+    """
+    host = request.client.host if request.client else "unknown"
+
+    if not _is_trusted_proxy(host=host):
+        return host
+
+    forwarded = [
+        address.strip()
+        for header in request.headers.getlist(rate_limit_settings.client_ip_header)
+        for address in header.split(",")
+        if address.strip()
+    ]
+    for address in reversed(forwarded):
+        host = address
+        if not _is_trusted_proxy(host=host):
+            break
+
+    return host
+
+
+def rate_limit(
+    scope: str, ip_limit: int, email_limit: int | None = None
+) -> Callable[..., Awaitable[None]]:
+    """Limit the requests per client ip and per email in a sliding window.
+
+    Dependencies:
+        scope: The name of the rate limited endpoint.
+        ip_limit: The max requests per window per client ip.
+        email_limit: The max requests per window per email, not limited if None.
+        request: The request.
+
+    Raises:
+        TooManyRequestsError: If a limit is exceeded.
+
+    """
+
+    async def _dependency(request: Request) -> None:
+        if not rate_limit_settings.enabled:
+            return
+
+        limits = {
+            RATE_LIMIT_KEY.format(
+                scope=f"{scope}:ip",
+                subject=_get_client_ip(request=request),
+            ): ip_limit
+        }
+
+        email = None if email_limit is None else await _get_email(request=request)
+        if email is not None and email_limit is not None:
+            limits[RATE_LIMIT_KEY.format(scope=f"{scope}:email", subject=email)] = (
+                email_limit
+            )
+
+        retry_after = await hit_rate_limits(
+            limits=limits, window=rate_limit_settings.window
+        )
+        if retry_after:
+            raise TooManyRequestsError(retry_after=retry_after)
+
+    return _dependency
@@ -1,3 +1,3 @@
-from api.routers import auth, user
+from api.routers import auth, metrics, user
 
-__all__ = ["auth", "user"]
+__all__ = ["auth", "metrics", "user"]
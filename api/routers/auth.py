@@ -2,28 +2,81 @@ from typing import Annotated
 
 from fastapi import APIRouter, Body, Depends, Path, status
 from fastapi.responses import JSONResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.dependencies import auth, db
-from api.schemas import LoginSchema, TokenSchema, UserCreateSchema, UserResponseSchema
-from settings import auth_settings
+from api.dependencies import admission, auth, db, rate_limit
+from api.schemas import (
+    IntrospectionSchema,
+    IntrospectSchema,
+    LoginSchema,
+    RefreshSchema,
+    TokenSchema,
+    UserCreateSchema,
+    UserResponseSchema,
+)
+from settings import auth_settings, rate_limit_settings
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
-@router.post(path="/login")
+@router.post(
+    path="/login",
+    dependencies=[
+        Depends(
+            dependency=rate_limit.rate_limit(
+                scope="login",
+                ip_limit=rate_limit_settings.login_ip,
+                email_limit=rate_limit_settings.login_email,
+            )
+        ),
+        Depends(dependency=admission.admit_hash),
+    ],
+)
 async def login(
     data: Annotated[LoginSchema, Body(description="Data for login")],
     session: Annotated[AsyncSession, Depends(dependency=db.get_session)],
     usecase: Annotated[auth.AuthUsecase, Depends(dependency=auth.get_auth_usecase)],
 ) -> TokenSchema:
     return TokenSchema(
-        access_token=await usecase.login(session=session, **data.model_dump()),
+        **await usecase.login(session=session, **data.model_dump()),
         token_type=auth_settings.token_type,
     )
 
 
-@router.post(path="/register")
+@router.post(path="/refresh")
+async def refresh(
+    data: Annotated[RefreshSchema, Body(description="Data for refresh")],
+    session: Annotated[AsyncSession, Depends(dependency=db.get_read_session)],
+    usecase: Annotated[auth.AuthUsecase, Depends(dependency=auth.get_auth_usecase)],
+) -> TokenSchema:
+    return TokenSchema(
+        **await usecase.refresh(session=session, **data.model_dump()),
+        token_type=auth_settings.token_type,
+    )
+
+
+@router.post(path="/logout")
+async def logout(
+    credentials: Annotated[
+        HTTPAuthorizationCredentials, Depends(dependency=auth.security)
+    ],
+    usecase: Annotated[auth.AuthUsecase, Depends(dependency=auth.get_auth_usecase)],
+    data: Annotated[
+        RefreshSchema | None, Body(description="Refresh token to revoke")
+    ] = None,
+) -> JSONResponse:
+    await usecase.logout(
+        token=credentials.credentials,
+        refresh_token=data.refresh_token if data else None,
+    )
+    return JSONResponse(
+        content={"message": "Logged out successfully"},
+        status_code=status.HTTP_202_ACCEPTED,
+    )
+
+
+@router.post(path="/register", dependencies=[Depends(dependency=admission.admit_hash)])
 async def register(
     data: Annotated[UserCreateSchema, Body(description="User data for register")],
     session: Annotated[AsyncSession, Depends(dependency=db.get_session)],
@@ -34,20 +87,42 @@ async def register(
     )
 
 
-@router.post(path="/send/{email}/code")
+@router.post(
+    path="/send/{email}/code",
+    dependencies=[
+        Depends(
+            dependency=rate_limit.rate_limit(
+                scope="send_code",
+                ip_limit=rate_limit_settings.send_code_ip,
+                email_limit=rate_limit_settings.send_code_email,
+            )
+        )
+    ],
+)
 async def send_email_code(
     email: Annotated[str, Path(description="Email for sending code")],
     session: Annotated[AsyncSession, Depends(dependency=db.get_session)],
     usecase: Annotated[auth.AuthUsecase, Depends(dependency=auth.get_auth_usecase)],
 ) -> JSONResponse:
-    await usecase.send_email_code(session=session, email=email)
+    retry_after = await usecase.send_email_code(session=session, email=email)
     return JSONResponse(
-        content={"message": "Email code sent successfully"},
+        content={"message": "Email code sent successfully", "retry_after": retry_after},
         status_code=status.HTTP_202_ACCEPTED,
     )
 
 
-@router.post(path="/verify/{email}/{code}")
+@router.post(
+    path="/verify/{email}/{code}",
+    dependencies=[
+        Depends(
+            dependency=rate_limit.rate_limit(
+                scope="verify",
+                ip_limit=rate_limit_settings.verify_ip,
+                email_limit=rate_limit_settings.verify_email,
+            )
+        )
+    ],
+)
 async def verify_email(
     email: Annotated[str, Path(description="Email for verification")],
     code: Annotated[str, Path(description="Code for verification")],
@@ -59,3 +134,27 @@ async def verify_email(
         content={"message": "Email verified successfully"},
         status_code=status.HTTP_202_ACCEPTED,
     )
+
+
+@router.post(
+    path="/introspect",
+    dependencies=[
+        Depends(
+            dependency=rate_limit.rate_limit(
+                scope="introspect", ip_limit=rate_limit_settings.introspect_ip
+            )
+        ),
+        Depends(dependency=auth.verify_service),
+    ],
+)
+async def introspect(
+    data: Annotated[IntrospectSchema, Body(description="Tokens for introspection")],
+    session: Annotated[AsyncSession, Depends(dependency=db.get_read_session)],
+    usecase: Annotated[auth.AuthUsecase, Depends(dependency=auth.get_auth_usecase)],
+) -> list[IntrospectionSchema]:
+    return [
+        IntrospectionSchema.model_validate(introspection)
+        for introspection in await usecase.introspect(
+            session=session, **data.model_dump()
+        )
+    ]
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends
+
+from api.dependencies import auth
+from api.schemas import (
+    AdmissionStatsSchema,
+    BloomFilterStatsSchema,
+    CacheStatsSchema,
+    MetricsSchema,
+    ReplicaStatsSchema,
+    UserCacheStatsSchema,
+)
+from db.sessions import replicas
+from usecases.auth import payload_cache, revoked_tokens
+from usecases.user import user_cache
+from utils.admission import hash_admission
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"],
+    dependencies=[Depends(dependency=auth.verify_service)],
+)
+
+
+@router.get(path="")
+async def get_metrics() -> MetricsSchema:
+    return MetricsSchema(
+        hash_admission=AdmissionStatsSchema.model_validate(hash_admission.stats()),
+        token_cache=CacheStatsSchema.model_validate(payload_cache.stats()),
+        user_cache=UserCacheStatsSchema.model_validate(user_cache.stats()),
+        revoked_tokens=BloomFilterStatsSchema.model_validate(revoked_tokens.stats()),
+        replicas=[
+            ReplicaStatsSchema.model_validate(replica) for replica in replicas.stats()
+        ],
+    )
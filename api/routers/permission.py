@@ -8,7 +8,7 @@ from api.schemas import (
     PermissionFilterSchema,
     PermissionResponseSchema,
     PermissionStatusUpdateSchema,
-    UserResponseSchema,
+    PrincipalSchema,
 )
 from enums import ActionEnum, ResourceEnum
 from usecases import PermissionUsecase
@@ -24,11 +24,11 @@ async def get_permissions(
     usecase: Annotated[
         PermissionUsecase, Depends(dependency=permission.get_permission_usecase)
     ],
-    session: Annotated[AsyncSession, Depends(dependency=db.get_session)],
+    session: Annotated[AsyncSession, Depends(dependency=db.get_read_session)],
     current_user: Annotated[
-        UserResponseSchema,
+        PrincipalSchema,
         Depends(
-            dependency=auth.get_current_user(
+            dependency=auth.get_current_principal(
                 action=ActionEnum.READ, resource=ResourceEnum.PERMISSION
             )
         ),
@@ -57,9 +57,9 @@ async def update_permission(
     ],
     session: Annotated[AsyncSession, Depends(dependency=db.get_session)],
     current_user: Annotated[
-        UserResponseSchema,
+        PrincipalSchema,
         Depends(
-            dependency=auth.get_current_user(
+            dependency=auth.get_current_principal(
                 action=ActionEnum.UPDATE, resource=ResourceEnum.PERMISSION
             )
         ),
@@ -1,12 +1,23 @@
-from typing import Annotated
+import io
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Body, Depends, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Body, Depends, File, Query, UploadFile, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.dependencies import auth, db, user
-from api.schemas import UserResponseSchema, UserUpdateSchema
-from enums import ActionEnum, ResourceEnum
+from api.schemas import (
+    PrincipalSchema,
+    UserFilterSchema,
+    UserImportSchema,
+    UserListQuerySchema,
+    UserPageSchema,
+    UserResponseSchema,
+    UserUpdateSchema,
+)
+from db.sessions import SessionFactory
+from enums import ActionEnum, ResourceEnum, RoleEnum
+from utils.importer import read_users
 
 router = APIRouter(prefix="/user", tags=["User"])
 
@@ -25,15 +36,98 @@ async def get_me(
     return current_user
 
 
+@router.get(path="/list")
+async def get_users(
+    query: Annotated[
+        UserListQuerySchema, Query(description="Filters and page for get users")
+    ],
+    usecase: Annotated[user.UserUsecase, Depends(dependency=user.get_user_usecase)],
+    session: Annotated[AsyncSession, Depends(dependency=db.get_read_session)],
+    current_user: Annotated[
+        PrincipalSchema,
+        Depends(
+            dependency=auth.get_current_principal(
+                action=ActionEnum.READ,
+                resource=ResourceEnum.USER,
+                roles=[RoleEnum.ADMIN, RoleEnum.SUPPORT],
+            )
+        ),
+    ],
+) -> UserPageSchema:
+    users, next_cursor = await usecase.get_users(
+        session=session, **query.model_dump(exclude_none=True)
+    )
+    return UserPageSchema(
+        items=[UserResponseSchema.model_validate(user) for user in users],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get(path="/export", response_class=StreamingResponse)
+async def export_users(
+    filters: Annotated[UserFilterSchema, Query(description="Filters for export users")],
+    usecase: Annotated[user.UserUsecase, Depends(dependency=user.get_user_usecase)],
+    session_maker: Annotated[
+        SessionFactory, Depends(dependency=db.get_read_session_maker)
+    ],
+    current_user: Annotated[
+        PrincipalSchema,
+        Depends(
+            dependency=auth.get_current_principal(
+                action=ActionEnum.READ,
+                resource=ResourceEnum.USER,
+                roles=[RoleEnum.ADMIN],
+            )
+        ),
+    ],
+) -> StreamingResponse:
+    return StreamingResponse(
+        content=usecase.export(
+            session_maker=session_maker, **filters.model_dump(exclude_none=True)
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post(path="/import")
+async def import_users(
+    file: Annotated[UploadFile, File(description="CSV or NDJSON file with users")],
+    file_format: Annotated[
+        Literal["csv", "ndjson"], Query(description="Format of the file")
+    ],
+    usecase: Annotated[user.UserUsecase, Depends(dependency=user.get_user_usecase)],
+    session: Annotated[AsyncSession, Depends(dependency=db.get_session)],
+    current_user: Annotated[
+        PrincipalSchema,
+        Depends(
+            dependency=auth.get_current_principal(
+                action=ActionEnum.CREATE,
+                resource=ResourceEnum.USER,
+                roles=[RoleEnum.ADMIN],
+            )
+        ),
+    ],
+) -> UserImportSchema:
+    return UserImportSchema.model_validate(
+        await usecase.import_users(
+            session=session,
+            users=read_users(
+                file=io.TextIOWrapper(file.file, encoding="utf-8", newline=""),
+                file_format=file_format,
+            ),
+        )
+    )
+
+
 @router.patch(path="/me")
 async def update_user(
     data: Annotated[UserUpdateSchema, Body(description="Data for update user")],
     usecase: Annotated[user.UserUsecase, Depends(dependency=user.get_user_usecase)],
     session: Annotated[AsyncSession, Depends(dependency=db.get_session)],
     current_user: Annotated[
-        UserResponseSchema,
+        PrincipalSchema,
         Depends(
-            dependency=auth.get_current_user(
+            dependency=auth.get_current_principal(
                 action=ActionEnum.UPDATE, resource=ResourceEnum.USER
             )
         ),
@@ -51,9 +145,9 @@ async def delete_user(
     usecase: Annotated[user.UserUsecase, Depends(dependency=user.get_user_usecase)],
     session: Annotated[AsyncSession, Depends(dependency=db.get_session)],
     current_user: Annotated[
-        UserResponseSchema,
+        PrincipalSchema,
         Depends(
-            dependency=auth.get_current_user(
+            dependency=auth.get_current_principal(
                 action=ActionEnum.DELETE, resource=ResourceEnum.USER
             )
         ),
@@ -1,18 +1,59 @@
-from api.schemas.auth import LoginSchema, TokenSchema
+from api.schemas.auth import (
+    IntrospectionSchema,
+    IntrospectSchema,
+    LoginSchema,
+    PermissionCheckSchema,
+    PermissionGrantSchema,
+    PrincipalSchema,
+    RefreshSchema,
+    TokenSchema,
+)
+from api.schemas.metrics import (
+    AdmissionStatsSchema,
+    BloomFilterStatsSchema,
+    CacheStatsSchema,
+    MetricsSchema,
+    ReplicaStatsSchema,
+    UserCacheStatsSchema,
+)
 from api.schemas.permission import (
     PermissionFilterSchema,
     PermissionResponseSchema,
     PermissionStatusUpdateSchema,
 )
-from api.schemas.user import UserCreateSchema, UserResponseSchema, UserUpdateSchema
+from api.schemas.user import (
+    UserCreateSchema,
+    UserFilterSchema,
+    UserImportSchema,
+    UserListQuerySchema,
+    UserPageSchema,
+    UserResponseSchema,
+    UserUpdateSchema,
+)
 
 __all__ = [
     "LoginSchema",
     "TokenSchema",
+    "RefreshSchema",
+    "PrincipalSchema",
+    "IntrospectSchema",
+    "IntrospectionSchema",
+    "PermissionCheckSchema",
+    "PermissionGrantSchema",
     "UserResponseSchema",
     "UserCreateSchema",
     "UserUpdateSchema",
+    "UserFilterSchema",
+    "UserImportSchema",
+    "UserListQuerySchema",
+    "UserPageSchema",
     "PermissionStatusUpdateSchema",
     "PermissionResponseSchema",
     "PermissionFilterSchema",
+    "AdmissionStatsSchema",
+    "CacheStatsSchema",
+    "MetricsSchema",
+    "UserCacheStatsSchema",
+    "BloomFilterStatsSchema",
+    "ReplicaStatsSchema",
 ]
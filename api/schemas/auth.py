@@ -1,5 +1,7 @@
 from pydantic import BaseModel, EmailStr, Field
 
+from enums import ActionEnum, ResourceEnum, RoleEnum
+
 
 class LoginSchema(BaseModel):
     email: EmailStr | None = Field(default=None, description="Email of the user")
@@ -8,4 +10,43 @@ class LoginSchema(BaseModel):
 
 class TokenSchema(BaseModel):
     access_token: str = Field(default=..., description="Access token")
+    refresh_token: str = Field(default=..., description="Refresh token")
     token_type: str = Field(default=..., description="Token type")
+
+
+class RefreshSchema(BaseModel):
+    refresh_token: str = Field(default=..., description="Refresh token")
+
+
+class PrincipalSchema(BaseModel):
+    id: int = Field(default=..., description="ID of the user", gt=0)
+    email: EmailStr = Field(default=..., description="Email of the user")
+    role: RoleEnum = Field(default=..., description="Role of the user")
+
+
+class PermissionCheckSchema(BaseModel):
+    action: ActionEnum = Field(default=..., description="Action")
+    resource: ResourceEnum = Field(default=..., description="Resource")
+
+
+class IntrospectSchema(BaseModel):
+    tokens: list[str] = Field(
+        default=..., description="Access tokens", min_length=1, max_length=100
+    )
+    permissions: list[PermissionCheckSchema] = Field(
+        default=[], description="Permissions to check for every token"
+    )
+
+
+class PermissionGrantSchema(PermissionCheckSchema):
+    is_allowed: bool = Field(default=..., description="Is allowed")
+
+
+class IntrospectionSchema(BaseModel):
+    active: bool = Field(default=..., description="Is the token valid and active")
+    id: int | None = Field(default=None, description="ID of the user")
+    email: EmailStr | None = Field(default=None, description="Email of the user")
+    role: RoleEnum | None = Field(default=None, description="Role of the user")
+    permissions: list[PermissionGrantSchema] = Field(
+        default=[], description="Checked permissions"
+    )
@@ -0,0 +1,57 @@
+from pydantic import BaseModel, Field
+
+
+class AdmissionStatsSchema(BaseModel):
+    limit: int = Field(default=..., description="Max concurrent requests")
+    queue_size: int = Field(default=..., description="Max queued requests")
+    active: int = Field(default=..., description="Requests holding a slot")
+    queued: int = Field(default=..., description="Requests waiting for a slot")
+    admitted: int = Field(default=..., description="Admitted requests")
+    rejected: int = Field(default=..., description="Rejected requests")
+
+
+class CacheStatsSchema(BaseModel):
+    size: int = Field(default=..., description="Cached entries")
+    maxsize: int = Field(default=..., description="Max cached entries")
+    hits: int = Field(default=..., description="Cache hits")
+    misses: int = Field(default=..., description="Cache misses")
+
+
+class UserCacheStatsSchema(BaseModel):
+    size: int = Field(default=..., description="Entries cached by the worker")
+    maxsize: int = Field(default=..., description="Max entries cached by the worker")
+    local_hits: int = Field(default=..., description="Worker cache hits")
+    shared_hits: int = Field(default=..., description="Redis cache hits")
+    misses: int = Field(default=..., description="Cache misses")
+
+
+class BloomFilterStatsSchema(BaseModel):
+    size: int = Field(default=..., description="Filter size in bits")
+    hashes: int = Field(default=..., description="Hash functions per key")
+    count: int = Field(default=..., description="Added keys")
+    capacity: int = Field(default=..., description="Expected keys")
+    checks: int = Field(default=..., description="Checked keys")
+    positives: int = Field(default=..., description="Keys that may have been added")
+
+
+class ReplicaStatsSchema(BaseModel):
+    host: str = Field(default=..., description="Replica host")
+    lag: float | None = Field(
+        default=..., description="Replay lag in seconds, None if unreachable"
+    )
+    in_rotation: bool = Field(default=..., description="Replica serves reads")
+    active: int = Field(default=..., description="Sessions using the replica")
+
+
+class MetricsSchema(BaseModel):
+    hash_admission: AdmissionStatsSchema = Field(
+        default=..., description="Password hashing admission"
+    )
+    token_cache: CacheStatsSchema = Field(
+        default=..., description="Decoded token cache"
+    )
+    user_cache: UserCacheStatsSchema = Field(default=..., description="User cache")
+    revoked_tokens: BloomFilterStatsSchema = Field(
+        default=..., description="Revoked tokens filter"
+    )
+    replicas: list[ReplicaStatsSchema] = Field(default=..., description="Read replicas")
@@ -34,3 +34,29 @@ class UserResponseSchema(UserBaseSchema):
 
     class Config:
         from_attributes = True
+
+
+class UserFilterSchema(BaseModel):
+    role: RoleEnum | None = Field(default=None, description="Role of the user")
+    is_active: bool | None = Field(default=None, description="Is the user active")
+
+
+class UserListQuerySchema(UserFilterSchema):
+    limit: int = Field(default=50, description="Max users per page", ge=1, le=500)
+    cursor: int | None = Field(
+        default=None, description="Cursor of the page from the previous page"
+    )
+
+
+class UserPageSchema(BaseModel):
+    items: list[UserResponseSchema] = Field(default=..., description="Users")
+    next_cursor: int | None = Field(
+        default=None, description="Cursor of the next page, if there is one"
+    )
+
+
+class UserImportSchema(BaseModel):
+    received: int = Field(default=..., description="Users in the file")
+    imported: int = Field(
+        default=..., description="Imported users, existing emails are skipped"
+    )
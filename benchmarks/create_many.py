@@ -0,0 +1,70 @@
+"""Compare creating users with a refresh per row and with INSERT ... RETURNING.
+
+Run against a migrated database (`make build`), the created users are deleted:
+
+    python -m benchmarks.create_many --rows 10000
+
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+from sqlalchemy import delete
+
+from db.models import User
+from db.repositories import UserRepository
+from db.sessions import async_engine, async_session
+from enums import RoleEnum
+
+
+async def _create_with_refresh(data: list[dict[str, Any]]) -> None:
+    async with async_session() as session:
+        users = [User(**item) for item in data]
+
+        session.add_all(users)
+        await session.commit()
+        for user in users:
+            await session.refresh(user)
+
+
+async def _create_many(data: list[dict[str, Any]]) -> None:
+    async with async_session() as session:
+        await UserRepository().create_many(session=session, data=data)
+
+
+async def main(rows: int) -> None:
+    creators: tuple[tuple[str, Callable[..., Awaitable[None]]], ...] = (
+        ("refresh per row", _create_with_refresh),
+        ("insert returning", _create_many),
+    )
+
+    for title, create in creators:
+        prefix = f"benchmark-{uuid.uuid4().hex[:8]}"
+        data = [
+            {"email": f"{prefix}-{i}@example.com", "role": RoleEnum.USER}
+            for i in range(rows)
+        ]
+
+        started = time.perf_counter()
+        await create(data)
+        logger.info(f"{title}: {rows} rows in {time.perf_counter() - started:.2f}s")
+
+        async with async_session() as session:
+            await session.execute(
+                statement=delete(User).where(User.email.startswith(prefix))
+            )
+            await session.commit()
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    asyncio.run(main(rows=args.rows))
@@ -0,0 +1,102 @@
+"""Measure `/user/me` latency while a login storm is running.
+
+Run against a started service (`make build`) with the credentials of an active user,
+and rate limiting disabled (`RATE_LIMIT_ENABLED=False`):
+
+    python -m benchmarks.login_storm --email user@example.com --password secret
+
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from loguru import logger
+
+
+async def _login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await client.post(
+        url="/auth/login", json={"email": email, "password": password}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def _storm(
+    client: httpx.AsyncClient, email: str, password: str, stop: asyncio.Event
+) -> int:
+    logins = 0
+    while not stop.is_set():
+        await client.post(
+            url="/auth/login", json={"email": email, "password": password}
+        )
+        logins += 1
+    return logins
+
+
+async def _probe(client: httpx.AsyncClient, token: str, duration: float) -> list[float]:
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get(
+            url="/user/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def _report(title: str, latencies: list[float]) -> None:
+    percentiles = statistics.quantiles(latencies, n=100)
+    logger.info(
+        f"{title}: {len(latencies)} requests, "
+        f"p50={percentiles[49]:.1f}ms p99={percentiles[98]:.1f}ms"
+    )
+
+
+async def main(
+    url: str, email: str, password: str, concurrency: int, duration: float
+) -> None:
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        token = await _login(client=client, email=email, password=password)
+
+        _report(
+            title="idle", latencies=await _probe(client, token=token, duration=duration)
+        )
+
+        stop = asyncio.Event()
+        storm = [
+            asyncio.create_task(
+                _storm(client, email=email, password=password, stop=stop)
+            )
+            for _ in range(concurrency)
+        ]
+        latencies = await _probe(client, token=token, duration=duration)
+        stop.set()
+        logins = sum(await asyncio.gather(*storm))
+
+        _report(title=f"storm ({logins} logins)", latencies=latencies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    asyncio.run(
+        main(
+            url=args.url,
+            email=args.email,
+            password=args.password,
+            concurrency=args.concurrency,
+            duration=args.duration,
+        )
+    )
@@ -0,0 +1,85 @@
+"""Compare user lookups by email with a statement built per call and built once.
+
+Measures the statement building and cache key overhead alone, then the whole lookup
+against a migrated database (`make build`), the created user is deleted:
+
+    python -m benchmarks.repository_lookup --number 10000
+
+"""
+
+import argparse
+import asyncio
+import time
+import timeit
+import uuid
+
+from loguru import logger
+from sqlalchemy import Select, delete, func, select
+
+from db.models import User
+from db.repositories import UserRepository
+from db.repositories.user import GET_BY_EMAIL
+from db.sessions import async_engine, async_session
+from enums import RoleEnum
+
+
+def _build(email: str) -> Select:
+    return select(User).where(func.lower(User.email) == email.lower())
+
+
+def _overhead(email: str, number: int) -> None:
+    def per_call() -> None:
+        _build(email=email)._generate_cache_key()
+
+    def built_once() -> None:
+        GET_BY_EMAIL._generate_cache_key()
+
+    for title, function in (("per call", per_call), ("built once", built_once)):
+        seconds = min(timeit.repeat(stmt=function, number=number, repeat=5))
+        logger.info(f"{title}: {seconds / number * 1_000_000:.2f}us to build")
+
+
+async def _lookups(email: str, number: int) -> None:
+    repository = UserRepository()
+
+    async with async_session() as session:
+
+        async def per_call() -> None:
+            result = await session.execute(statement=_build(email=email))
+            result.scalar_one_or_none()
+
+        async def built_once() -> None:
+            await repository.get_by_email(session=session, email=email)
+
+        for title, lookup in (("per call", per_call), ("built once", built_once)):
+            started = time.perf_counter()
+            for _ in range(number):
+                await lookup()
+            seconds = time.perf_counter() - started
+            logger.info(f"{title}: {seconds / number * 1_000_000:.2f}us per lookup")
+
+
+async def main(number: int) -> None:
+    email = f"benchmark-{uuid.uuid4().hex[:8]}@example.com"
+    _overhead(email=email, number=number)
+
+    async with async_session() as session:
+        await UserRepository().create(
+            session=session, data={"email": email, "role": RoleEnum.USER}
+        )
+
+    await _lookups(email=email, number=number)
+
+    async with async_session() as session:
+        await session.execute(statement=delete(User).where(User.email == email))
+        await session.commit()
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=10000)
+    args = parser.parse_args()
+
+    asyncio.run(main(number=args.number))
@@ -0,0 +1,43 @@
+"""Compare cached and uncached access token verification.
+
+python -m benchmarks.token_cache
+
+"""
+
+import argparse
+import timeit
+
+from jose import jwt
+from loguru import logger
+
+from settings import auth_settings
+from usecases import AuthUsecase
+from usecases.auth import payload_cache
+
+
+def main(number: int) -> None:
+    usecase = AuthUsecase()
+    token = usecase._create_access_token(data={"sub": "user@example.com"})
+
+    def uncached() -> None:
+        jwt.decode(
+            token=token,
+            key=auth_settings.secret_key,
+            algorithms=[auth_settings.algorithm],
+        )
+
+    def cached() -> None:
+        usecase.get_payload(token=token)
+
+    payload_cache.clear()
+    for title, function in (("uncached", uncached), ("cached", cached)):
+        seconds = min(timeit.repeat(stmt=function, number=number, repeat=5))
+        logger.info(f"{title}: {seconds / number * 1_000_000:.2f}us per token")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=10000)
+    args = parser.parse_args()
+
+    main(number=args.number)
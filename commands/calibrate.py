@@ -0,0 +1,32 @@
+"""Calibrate the password hashing cost for the deployed hardware.
+
+Run once per deploy, the workers hash with the shared cost:
+
+python -m commands.calibrate
+
+"""
+
+import argparse
+import asyncio
+
+from loguru import logger
+
+from settings import crypto_settings
+from utils import crypto
+from utils.redis import redis_client, set_password_cost
+
+
+async def main() -> None:
+    cost = await set_password_cost(
+        scheme=crypto_settings.scheme,
+        cost=await asyncio.to_thread(crypto.measure_cost),
+    )
+    await redis_client.aclose()
+
+    logger.info(f"Password cost of {crypto_settings.scheme}: {cost}")
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description=__doc__).parse_args()
+
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+"""Import users from a CSV or NDJSON file.
+
+python -m commands.import_users users.csv --format csv
+
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+from typing import Literal
+
+from loguru import logger
+
+from db.sessions import async_engine, async_session
+from usecases import UserUsecase
+from utils import crypto
+from utils.importer import read_users
+
+
+async def main(path: Path, file_format: Literal["csv", "ndjson"]) -> None:
+    logger.info(f"Password policy: {await crypto.calibrate()}")
+    crypto.start_executor()
+
+    try:
+        with path.open(encoding="utf-8", newline="") as file:
+            async with async_session() as session:
+                result = await UserUsecase().import_users(
+                    session=session,
+                    users=read_users(file=file, file_format=file_format),
+                )
+    finally:
+        crypto.shutdown_executor()
+        await async_engine.dispose()
+
+    logger.info(f"Imported {result['imported']} of {result['received']} users")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    args = parser.parse_args()
+
+    asyncio.run(main(path=args.path, file_format=args.format))
@@ -1,3 +1,3 @@
-from constants.permission import ROLE_PERMISSIONS
+from constants.permission import PERMISSION_BITS, ROLE_PERMISSIONS
 
-__all__ = ["ROLE_PERMISSIONS"]
+__all__ = ["ROLE_PERMISSIONS", "PERMISSION_BITS"]
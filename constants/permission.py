@@ -14,3 +14,16 @@ ROLE_PERMISSIONS = {
         ResourceEnum.PERMISSION: [ActionEnum.READ],
     },
 }
+
+# Access tokens carry these bits, so a bit must never be reused or moved: give new
+# actions and resources new bits.
+PERMISSION_BITS = {
+    (ActionEnum.CREATE, ResourceEnum.USER): 1 << 0,
+    (ActionEnum.READ, ResourceEnum.USER): 1 << 1,
+    (ActionEnum.UPDATE, ResourceEnum.USER): 1 << 2,
+    (ActionEnum.DELETE, ResourceEnum.USER): 1 << 3,
+    (ActionEnum.CREATE, ResourceEnum.PERMISSION): 1 << 4,
+    (ActionEnum.READ, ResourceEnum.PERMISSION): 1 << 5,
+    (ActionEnum.UPDATE, ResourceEnum.PERMISSION): 1 << 6,
+    (ActionEnum.DELETE, ResourceEnum.PERMISSION): 1 << 7,
+}
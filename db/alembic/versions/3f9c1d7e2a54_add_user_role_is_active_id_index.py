@@ -0,0 +1,30 @@
+"""Add user role is_active id index
+
+Revision ID: 3f9c1d7e2a54
+Revises: b33d160f4af0
+Create Date: 2026-10-18 17:47:19
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9c1d7e2a54"
+down_revision: Union[str, None] = "b33d160f4af0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "index_role_is_active_id",
+        "users",
+        ["role", "is_active", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("index_role_is_active_id", table_name="users")
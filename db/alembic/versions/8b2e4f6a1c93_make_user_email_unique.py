@@ -0,0 +1,43 @@
+"""Make user email unique
+
+Revision ID: 8b2e4f6a1c93
+Revises: 3f9c1d7e2a54
+Create Date: 2026-10-18 17:52:05
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8b2e4f6a1c93"
+down_revision: Union[str, None] = "3f9c1d7e2a54"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the oldest user of every duplicated email, and deactivate the others
+    # under a renamed email so the unique index can be created.
+    op.execute(sa.text("""
+            UPDATE users
+            SET email = 'duplicate-' || id || '+' || email, is_active = false
+            WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY email ORDER BY id
+                    ) AS position
+                    FROM users
+                ) AS ranked
+                WHERE position > 1
+            )
+            """))
+    op.drop_index(op.f("ix_users_email"), table_name="users")
+    op.create_index(op.f("ix_users_email"), "users", ["email"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_users_email"), table_name="users")
+    op.create_index(op.f("ix_users_email"), "users", ["email"], unique=False)
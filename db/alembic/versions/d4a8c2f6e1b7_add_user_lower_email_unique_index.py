@@ -0,0 +1,48 @@
+"""Add user lower email unique index
+
+Revision ID: d4a8c2f6e1b7
+Revises: 8b2e4f6a1c93
+Create Date: 2026-10-18 18:05:28
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4a8c2f6e1b7"
+down_revision: Union[str, None] = "8b2e4f6a1c93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the oldest user of every email that differs only in case, and deactivate
+    # the others under a renamed email so the unique index can be created.
+    op.execute(sa.text("""
+            UPDATE users
+            SET email = 'duplicate-' || id || '+' || email, is_active = false
+            WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY lower(email) ORDER BY id
+                    ) AS position
+                    FROM users
+                ) AS ranked
+                WHERE position > 1
+            )
+            """))
+    op.drop_index(op.f("ix_users_email"), table_name="users")
+    op.create_index(
+        "ix_users_email_lower",
+        "users",
+        [sa.text("lower(email)")],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_email_lower", table_name="users")
+    op.create_index(op.f("ix_users_email"), "users", ["email"], unique=True)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import func
+from sqlalchemy import Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from db.models.base import Base
@@ -9,6 +9,10 @@ from enums import RoleEnum
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("index_role_is_active_id", "role", "is_active", "id"),
+        Index("ix_users_email_lower", text("lower(email)"), unique=True),
+    )
 
     id: Mapped[int] = mapped_column(
         primary_key=True, autoincrement=True, unique=True, comment="ID"
@@ -16,7 +20,7 @@ class User(Base):
 
     first_name: Mapped[str | None] = mapped_column(comment="First name")
     last_name: Mapped[str | None] = mapped_column(comment="Last name")
-    email: Mapped[str] = mapped_column(index=True, comment="Email")
+    email: Mapped[str] = mapped_column(comment="Email")
     role: Mapped[RoleEnum] = mapped_column(comment="Role")
 
     hashed_password: Mapped[str | None] = mapped_column(comment="Hashed password")
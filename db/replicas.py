@@ -0,0 +1,136 @@
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Literal
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """)
+
+
+class ReplicaPool:
+    def __init__(
+        self,
+        engines: list[AsyncEngine],
+        strategy: Literal["round_robin", "least_connections"],
+        max_lag: float,
+    ):
+        self.engines = engines
+        self.strategy = strategy
+        self.max_lag = max_lag
+
+        self._lags: dict[AsyncEngine, float | None] = dict.fromkeys(engines)
+        self._active: dict[AsyncEngine, int] = dict.fromkeys(engines, 0)
+        self._counter = itertools.count()
+
+    @staticmethod
+    def _host(engine: AsyncEngine) -> str:
+        return f"{engine.url.host}:{engine.url.port}"
+
+    def _in_rotation(self) -> list[AsyncEngine]:
+        return [
+            engine
+            for engine, lag in self._lags.items()
+            if lag is not None and lag <= self.max_lag
+        ]
+
+    def pick(self) -> AsyncEngine | None:
+        """Pick a replica in rotation with the configured strategy.
+
+        Returns:
+            The replica engine, None if no replica is in rotation.
+
+        """
+        engines = self._in_rotation()
+
+        if not engines:
+            return None
+
+        if self.strategy == "least_connections":
+            return min(engines, key=self._active.__getitem__)
+
+        return engines[next(self._counter) % len(engines)]
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncGenerator[AsyncEngine | None, None]:
+        """Pick a replica and count it as in use until the context exits.
+
+        Yields:
+            The replica engine, None if no replica is in rotation.
+
+        """
+        engine = self.pick()
+
+        if engine is None:
+            yield None
+            return
+
+        self._active[engine] += 1
+        try:
+            yield engine
+        finally:
+            self._active[engine] -= 1
+
+    async def check_lag(self) -> None:
+        """Measure the replay lag of every replica.
+
+        A replica that lags more than the max lag, or does not answer within it, is
+        taken out of rotation until it catches up.
+
+        """
+        for engine in self.engines:
+            try:
+                async with (
+                    asyncio.timeout(self.max_lag),
+                    engine.connect() as connection,
+                ):
+                    lag = float((await connection.execute(LAG_QUERY)).scalar_one())
+            except (SQLAlchemyError, OSError, TimeoutError) as exc:
+                logger.warning(f"Replica {self._host(engine)} is unreachable: {exc!r}")
+                lag = None
+
+            if lag is not None and lag > self.max_lag:
+                logger.warning(f"Replica {self._host(engine)} lags {lag:.1f}s behind")
+
+            self._lags[engine] = lag
+
+    async def watch_lag(self, interval: float) -> None:
+        """Check the replica lag forever.
+
+        Args:
+            interval: The seconds between checks.
+
+        """
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(interval)
+
+    def stats(self) -> list[dict]:
+        """Get the state of every replica.
+
+        Returns:
+            The host, lag, rotation and sessions in use of every replica.
+
+        """
+        in_rotation = self._in_rotation()
+
+        return [
+            {
+                "host": self._host(engine),
+                "lag": self._lags[engine],
+                "in_rotation": engine in in_rotation,
+                "active": self._active[engine],
+            }
+            for engine in self.engines
+        ]
@@ -1,6 +1,6 @@
 from typing import Any, Generic, Type, TypeVar
 
-from sqlalchemy import select
+from sqlalchemy import delete, insert, inspect, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 Model = TypeVar("Model")
@@ -32,24 +32,32 @@ class BaseRepository(Generic[Model]):
         return instance
 
     async def create_many(
-        self, session: AsyncSession, data: list[dict[str, Any]]
+        self, session: AsyncSession, data: list[dict[str, Any]], chunk_size: int = 1000
     ) -> list[Model]:
         """Create multiple model instances.
 
+        Every chunk of rows is inserted with one multi-row INSERT ... RETURNING, and
+        all chunks are committed together.
+
         Args:
             session: The async session.
             data: The data to create the model instances.
+            chunk_size: The max number of rows per statement.
 
         Returns:
-            The list of created model instances.
+            The list of created model instances, in the order of the data.
 
         """
-        instances = [self.model(**item) for item in data]
+        instances: list[Model] = []
+
+        for start in range(0, len(data), chunk_size):
+            result = await session.scalars(
+                insert(self.model).returning(self.model, sort_by_parameter_order=True),
+                data[start : start + chunk_size],
+            )
+            instances.extend(result.all())
 
-        session.add_all(instances)
         await session.commit()
-        for instance in instances:
-            await session.refresh(instance)
 
         return instances
 
@@ -90,6 +98,8 @@ class BaseRepository(Generic[Model]):
     ) -> Model | None:
         """Update a model instance by filters.
 
+        The instance is updated and returned with one UPDATE ... RETURNING.
+
         Args:
             session: The async session.
             data: The data to update the model instance.
@@ -99,20 +109,57 @@ class BaseRepository(Generic[Model]):
             The updated model instance.
 
         """
-        instance = await self.get_by(session=session, **filters)
-
-        if instance:
-            for key, value in data.items():
-                setattr(instance, key, value)
+        if not data:
+            return await self.get_by(session=session, **filters)
+
+        result = await session.scalars(
+            statement=update(self.model)
+            .filter_by(**filters)
+            .values(**data)
+            .returning(self.model)
+        )
+        instance = result.one_or_none()
 
-            await session.commit()
-            await session.refresh(instance=instance)
+        await session.commit()
 
         return instance
 
+    async def update_many(
+        self, session: AsyncSession, data: dict[str, Any], **filters
+    ) -> list[Model]:
+        """Update all model instances matching the filters.
+
+        The instances are updated and returned with one UPDATE ... RETURNING.
+
+        Args:
+            session: The async session.
+            data: The data to update the model instances.
+            **filters: The filters to apply to the query.
+
+        Returns:
+            The list of updated model instances.
+
+        """
+        if not data:
+            return await self.get_all(session=session, **filters)
+
+        result = await session.scalars(
+            statement=update(self.model)
+            .filter_by(**filters)
+            .values(**data)
+            .returning(self.model)
+        )
+        instances = list(result.all())
+
+        await session.commit()
+
+        return instances
+
     async def delete_by(self, session: AsyncSession, **filters) -> bool:
         """Delete a model instance by filters.
 
+        The instance is deleted with one DELETE ... RETURNING.
+
         Args:
             session: The async session.
             **filters: The filters to apply to the query.
@@ -121,12 +168,13 @@ class BaseRepository(Generic[Model]):
             True if the model instance was deleted, False otherwise.
 
         """
-        instance = await self.get_by(session=session, **filters)
-
-        if instance:
-            await session.delete(instance=instance)
-            await session.commit()
+        result = await session.execute(
+            statement=delete(self.model)
+            .filter_by(**filters)
+            .returning(*inspect(self.model).primary_key)
+        )
+        deleted = result.first() is not None
 
-            return True
+        await session.commit()
 
-        return False
+        return deleted
@@ -1,7 +1,60 @@
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from db.models.permission import Permission
 from db.repositories.base import BaseRepository
+from enums import ActionEnum, ResourceEnum, RoleEnum
+
+GET_BY_KEY = select(Permission).where(
+    Permission.role == bindparam("role"),
+    Permission.action == bindparam("action"),
+    Permission.resource == bindparam("resource"),
+)
 
 
 class PermissionRepository(BaseRepository[Permission]):
     def __init__(self):
         super().__init__(Permission)
+
+    async def get_by_key(
+        self,
+        session: AsyncSession,
+        role: RoleEnum,
+        action: ActionEnum,
+        resource: ResourceEnum,
+    ) -> Permission | None:
+        """Get the permission of the role for the action with a statement built once.
+
+        Args:
+            session: The async session.
+            role: The role.
+            action: The action.
+            resource: The resource.
+
+        Returns:
+            The permission.
+
+        """
+        result = await session.execute(
+            statement=GET_BY_KEY,
+            params={"role": role, "action": action, "resource": resource},
+        )
+        return result.scalar_one_or_none()
+
+    async def get_all_by_roles(
+        self, session: AsyncSession, roles: list[RoleEnum]
+    ) -> list[Permission]:
+        """Get the permissions of the roles in one query.
+
+        Args:
+            session: The async session.
+            roles: The roles.
+
+        Returns:
+            The list of permissions.
+
+        """
+        result = await session.execute(
+            statement=select(Permission).where(Permission.role.in_(roles))
+        )
+        return list(result.scalars().all())
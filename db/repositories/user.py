@@ -1,7 +1,273 @@
-from db.models import User
+from typing import Any, AsyncGenerator, Sequence
+
+from sqlalchemy import Row, RowMapping, and_, bindparam, false, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import Permission, User
 from db.repositories.base import BaseRepository
+from enums import ActionEnum, ResourceEnum
+
+IMPORT_TABLE = "users_import"
+IMPORT_COLUMNS = (
+    "email",
+    "first_name",
+    "last_name",
+    "role",
+    "is_active",
+    "hashed_password",
+)
+
+GET_BY_EMAIL = select(User).where(func.lower(User.email) == bindparam("email"))
+IS_ALLOWED = func.coalesce(Permission.is_active, false()).label("is_allowed")
+PERMISSION_OF_USER = and_(
+    Permission.role == User.role,
+    Permission.action == bindparam("action"),
+    Permission.resource == bindparam("resource"),
+)
+GET_PRINCIPAL = (
+    select(User.id, User.email, User.role, User.is_active, IS_ALLOWED)
+    .outerjoin(Permission, PERMISSION_OF_USER)
+    .where(func.lower(User.email) == bindparam("email"))
+)
+GET_WITH_PERMISSION = (
+    select(User, IS_ALLOWED)
+    .outerjoin(Permission, PERMISSION_OF_USER)
+    .where(func.lower(User.email) == bindparam("email"))
+)
+GET_PRINCIPALS = select(User.id, User.email, User.role, User.is_active).where(
+    func.lower(User.email).in_(bindparam("emails", expanding=True))
+)
 
 
 class UserRepository(BaseRepository[User]):
     def __init__(self):
         super().__init__(User)
+
+    async def create_unique(
+        self, session: AsyncSession, data: dict[str, Any]
+    ) -> User | None:
+        """Create a user unless its email is taken, regardless of case.
+
+        The user is inserted and returned with one INSERT ... ON CONFLICT DO NOTHING
+        RETURNING on the unique lower email index, so concurrent creations of the
+        same email can not both succeed.
+
+        Args:
+            session: The async session.
+            data: The data to create the user.
+
+        Returns:
+            The created user, None if the email is taken.
+
+        """
+        result = await session.scalars(
+            statement=insert(User)
+            .values(**data)
+            .on_conflict_do_nothing(index_elements=[func.lower(User.email)])
+            .returning(User)
+        )
+        user = result.one_or_none()
+        await session.commit()
+
+        return user
+
+    async def get_by_email(self, session: AsyncSession, email: str) -> User | None:
+        """Get a user by email with a statement built once.
+
+        Args:
+            session: The async session.
+            email: The email.
+
+        Returns:
+            The user.
+
+        """
+        result = await session.execute(
+            statement=GET_BY_EMAIL, params={"email": email.lower()}
+        )
+        return result.scalar_one_or_none()
+
+    async def create_import_table(self, session: AsyncSession) -> None:
+        """Create the staging table for imported users, dropped on commit.
+
+        Args:
+            session: The async session.
+
+        """
+        await session.execute(
+            statement=text(
+                "CREATE TEMPORARY TABLE users_import ("
+                "email varchar NOT NULL, first_name varchar, last_name varchar, "
+                "role varchar NOT NULL, is_active boolean NOT NULL, "
+                "hashed_password varchar"
+                ") ON COMMIT DROP"
+            )
+        )
+
+    async def copy_to_import_table(
+        self, session: AsyncSession, records: list[tuple]
+    ) -> None:
+        """Copy users into the staging table with the COPY protocol.
+
+        Args:
+            session: The async session.
+            records: The values of the import columns of every user.
+
+        """
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+
+        await raw_connection.driver_connection.copy_records_to_table(
+            IMPORT_TABLE, records=records, columns=IMPORT_COLUMNS
+        )
+
+    async def merge_import_table(self, session: AsyncSession) -> int:
+        """Insert the staged users, skipping emails that already exist.
+
+        Args:
+            session: The async session.
+
+        Returns:
+            The number of inserted users.
+
+        """
+        result = await session.execute(
+            statement=text(
+                "INSERT INTO users "
+                "(email, first_name, last_name, role, is_active, hashed_password) "
+                "SELECT email, first_name, last_name, role::roleenum, is_active, "
+                "hashed_password FROM users_import "
+                "ON CONFLICT (lower(email)) DO NOTHING"
+            )
+        )
+
+        return result.rowcount
+
+    async def get_page(
+        self, session: AsyncSession, limit: int, after: int | None = None, **filters
+    ) -> list[User]:
+        """Get a page of users ordered by id, after the last id of the previous page.
+
+        Pages are read with a keyset on the id, so deep pages are as fast as the
+        first one.
+
+        Args:
+            session: The async session.
+            limit: The max number of users.
+            after: The id of the last user of the previous page.
+            **filters: The filters to apply to the query.
+
+        Returns:
+            The list of users.
+
+        """
+        statement = select(User).filter_by(**filters).order_by(User.id).limit(limit)
+        if after is not None:
+            statement = statement.where(User.id > after)
+
+        result = await session.execute(statement=statement)
+        return list(result.scalars().all())
+
+    async def stream(
+        self, session: AsyncSession, batch_size: int = 1000, **filters
+    ) -> AsyncGenerator[Sequence[RowMapping], None]:
+        """Stream users ordered by id with a server side cursor, without passwords.
+
+        Args:
+            session: The async session.
+            batch_size: The number of users fetched per batch.
+            **filters: The filters to apply to the query.
+
+        Yields:
+            The batches of users as mappings of column values.
+
+        """
+        result = await session.stream(
+            statement=select(
+                User.id,
+                User.first_name,
+                User.last_name,
+                User.email,
+                User.role,
+                User.is_active,
+                User.last_login,
+                User.created_at,
+                User.updated_at,
+            )
+            .filter_by(**filters)
+            .order_by(User.id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        async for partition in result.mappings().partitions():
+            yield partition
+
+    async def get_principal(
+        self,
+        session: AsyncSession,
+        email: str,
+        action: ActionEnum,
+        resource: ResourceEnum,
+    ) -> Row | None:
+        """Get the user and its permission for the action in one query.
+
+        Args:
+            session: The async session.
+            email: The email.
+            action: The action.
+            resource: The resource.
+
+        Returns:
+            The id, email, role and is_active of the user, and is_allowed.
+
+        """
+        result = await session.execute(
+            statement=GET_PRINCIPAL,
+            params={"email": email.lower(), "action": action, "resource": resource},
+        )
+        return result.one_or_none()
+
+    async def get_with_permission(
+        self,
+        session: AsyncSession,
+        email: str,
+        action: ActionEnum,
+        resource: ResourceEnum,
+    ) -> Row | None:
+        """Get the user and its permission for the action in one query.
+
+        Args:
+            session: The async session.
+            email: The email.
+            action: The action.
+            resource: The resource.
+
+        Returns:
+            The user, and is_allowed.
+
+        """
+        result = await session.execute(
+            statement=GET_WITH_PERMISSION,
+            params={"email": email.lower(), "action": action, "resource": resource},
+        )
+        return result.one_or_none()
+
+    async def get_principals(
+        self, session: AsyncSession, emails: list[str]
+    ) -> list[Row]:
+        """Get the users with the emails in one query.
+
+        Args:
+            session: The async session.
+            emails: The emails.
+
+        Returns:
+            The id, email, role and is_active of the users.
+
+        """
+        result = await session.execute(
+            statement=GET_PRINCIPALS,
+            params={"emails": [email.lower() for email in emails]},
+        )
+        return list(result.all())
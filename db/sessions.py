@@ -1,15 +1,59 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import uuid
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from typing import AsyncGenerator, Callable
 
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import NullPool
+
+from db.replicas import ReplicaPool
 from settings import db_settings
 
-async_engine = create_async_engine(
-    url=db_settings.url,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
-    pool_timeout=30,
-    pool_recycle=1800,
-)
+
+def _prepared_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def build_engine(url: str) -> AsyncEngine:
+    """Build an engine, for a transaction pooler in front of the database if set.
+
+    Behind a transaction pooler the pooler owns the connections, so the engine
+    opens one per session, and never reuses prepared statements, which may live on
+    another server connection, or collide with the ones of another client.
+
+    Args:
+        url: The database url.
+
+    Returns:
+        The engine.
+
+    """
+    if db_settings.external_pooler:
+        return create_async_engine(
+            url=url,
+            poolclass=NullPool,
+            connect_args={
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": _prepared_statement_name,
+            },
+        )
+
+    return create_async_engine(
+        url=url,
+        pool_size=db_settings.pool_size,
+        max_overflow=db_settings.max_overflow,
+        pool_pre_ping=True,
+        pool_timeout=30,
+        pool_recycle=1800,
+    )
+
+
+async_engine = build_engine(url=db_settings.url)
 
 async_session = async_sessionmaker(
     bind=async_engine,
@@ -18,3 +62,44 @@ async_session = async_sessionmaker(
     autocommit=False,
     autoflush=False,
 )
+
+replicas = ReplicaPool(
+    engines=[build_engine(url=url) for url in db_settings.replica_urls],
+    strategy=db_settings.replica_strategy,
+    max_lag=db_settings.replica_max_lag,
+)
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+
+@asynccontextmanager
+async def read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Open a session on a read replica, or on the primary if none is in rotation.
+
+    The replica counts the session as active until it is closed.
+
+    Yields:
+        The session.
+
+    """
+    async with (
+        replicas.acquire() as engine,
+        async_session(bind=engine or async_engine) as session,
+    ):
+        yield session
+
+
+async def release(session: AsyncSession) -> None:
+    """End the transaction of a session, to return its connection to the pool.
+
+    A session takes a connection on its first statement and holds it until the
+    transaction ends, so a session that is done with the database releases it
+    before slow work instead of at the end of the request. The loaded instances
+    stay usable and the session takes a connection again if it is used later.
+
+    Args:
+        session: The session.
+
+    """
+    if session.in_transaction():
+        await session.commit()
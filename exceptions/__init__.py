@@ -4,9 +4,11 @@ from exceptions.auth import (
     AuthPermissionsError,
 )
 from exceptions.base import BaseError
+from exceptions.service import ServiceOverloadedError, TooManyRequestsError
 from exceptions.user import (
     UserAlreadyActiveError,
     UserAlreadyExistsError,
+    UserImportInvalidError,
     UserNotFoundError,
 )
 
@@ -17,5 +19,8 @@ __all__ = [
     "UserNotFoundError",
     "UserAlreadyExistsError",
     "UserAlreadyActiveError",
+    "UserImportInvalidError",
+    "ServiceOverloadedError",
+    "TooManyRequestsError",
     "BaseError",
 ]
@@ -6,7 +6,9 @@ class BaseError(Exception):
         self,
         message: str = "An error occurred",
         status_code: HTTPStatus = HTTPStatus.INTERNAL_SERVER_ERROR,
+        headers: dict[str, str] | None = None,
     ):
         super().__init__(message)
         self.message = message
         self.status_code = status_code
+        self.headers = headers
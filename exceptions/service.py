@@ -0,0 +1,31 @@
+from http import HTTPStatus
+
+from exceptions.base import BaseError
+
+
+class ServiceOverloadedError(BaseError):
+    def __init__(
+        self,
+        retry_after: int,
+        message: str = "Service is overloaded, try again later",
+        status_code: HTTPStatus = HTTPStatus.SERVICE_UNAVAILABLE,
+    ):
+        super().__init__(
+            message=message,
+            status_code=status_code,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class TooManyRequestsError(BaseError):
+    def __init__(
+        self,
+        retry_after: int,
+        message: str = "Too many requests, try again later",
+        status_code: HTTPStatus = HTTPStatus.TOO_MANY_REQUESTS,
+    ):
+        super().__init__(
+            message=message,
+            status_code=status_code,
+            headers={"Retry-After": str(retry_after)},
+        )
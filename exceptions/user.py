@@ -28,3 +28,13 @@ class UserAlreadyActiveError(BaseError):
         status_code: HTTPStatus = HTTPStatus.BAD_REQUEST,
     ):
         super().__init__(message=message, status_code=status_code)
+
+
+class UserImportInvalidError(BaseError):
+    def __init__(
+        self,
+        line: int,
+        message: str = "Invalid user on line {line}",
+        status_code: HTTPStatus = HTTPStatus.BAD_REQUEST,
+    ):
+        super().__init__(message=message.format(line=line), status_code=status_code)
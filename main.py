@@ -6,19 +6,49 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from loguru import logger
 
-from api.routers import auth, permission, user
+from api.routers import auth, metrics, permission, user
+from db.sessions import replicas
 from exceptions import BaseError
-from usecases import PermissionUsecase
+from settings import db_settings
+from usecases import AuthUsecase, PermissionUsecase
+from utils import crypto, tasks
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    permission_usecase = PermissionUsecase()
+
     logger.info("Initializing permissions:")
-    for perm in await PermissionUsecase().init_permissions():
+    for perm in await permission_usecase.init_permissions():
         logger.info(f"{perm.role}: {perm.action} -> {perm.resource}")
 
+    await permission_usecase.load_matrix()
+    permission_watcher = tasks.spawn(
+        permission_usecase.watch_matrix(), name="permission-watcher"
+    )
+
+    auth_usecase = AuthUsecase()
+    revocation_watcher = tasks.spawn(
+        auth_usecase.watch_revocations(last_id=await auth_usecase.load_revocations()),
+        name="revocation-watcher",
+    )
+
+    await replicas.check_lag()
+    replica_watcher = tasks.spawn(
+        replicas.watch_lag(interval=db_settings.replica_lag_check_interval),
+        name="replica-watcher",
+    )
+
+    logger.info(f"Password policy: {await crypto.calibrate()}")
+    crypto.start_executor()
+
     yield
 
+    permission_watcher.cancel()
+    revocation_watcher.cancel()
+    replica_watcher.cancel()
+    crypto.shutdown_executor()
+
 
 app = FastAPI(title="Auth API", lifespan=lifespan)
 
@@ -43,9 +73,14 @@ async def error_handler(request: Request, exc: BaseError) -> JSONResponse:
         The JSON response.
 
     """
-    return JSONResponse(content={"detail": exc.message}, status_code=exc.status_code)
+    return JSONResponse(
+        content={"detail": exc.message},
+        status_code=exc.status_code,
+        headers=exc.headers,
+    )
 
 
 app.include_router(router=auth.router)
 app.include_router(router=user.router)
 app.include_router(router=permission.router)
+app.include_router(router=metrics.router)
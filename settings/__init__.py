@@ -1,6 +1,15 @@
 from settings.auth import auth_settings
+from settings.crypto import crypto_settings
 from settings.db import db_settings
+from settings.rate_limit import rate_limit_settings
 from settings.redis import redis_settings
 from settings.smtp import smtp_settings
 
-__all__ = ["db_settings", "auth_settings", "redis_settings", "smtp_settings"]
+__all__ = [
+    "db_settings",
+    "auth_settings",
+    "crypto_settings",
+    "redis_settings",
+    "rate_limit_settings",
+    "smtp_settings",
+]
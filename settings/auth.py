@@ -12,8 +12,39 @@ class AuthSettings(BaseSettings):
     access_token_expire_minutes: int = Field(
         default=30, title="Access token expire minutes"
     )
+    refresh_token_expire_days: int = Field(
+        default=30, title="Refresh token expire days", ge=1
+    )
+    service_keys: list[str] = Field(
+        default=[], title="Keys of the services allowed to introspect tokens"
+    )
     token_type: str = Field(default="Bearer", title="Token type")
     verify_code_ttl: int = Field(default=60, title="Verify email code ttl")
+    verify_code_max_attempts: int = Field(
+        default=5, title="Failed attempts before a verify email code is deleted", ge=1
+    )
+    verify_code_cooldown: int = Field(
+        default=30, title="Seconds before a verify email code is sent again", ge=0
+    )
+    embed_permissions: bool = Field(
+        default=False, title="Embed role and permissions in access tokens"
+    )
+    token_cache_size: int = Field(
+        default=10000, title="Decoded token cache size per worker", ge=0
+    )
+    user_cache_size: int = Field(
+        default=10000, title="User cache size per worker", ge=0
+    )
+    user_cache_local_ttl: int = Field(
+        default=5, title="User cache ttl per worker in seconds", ge=0
+    )
+    user_cache_ttl: int = Field(default=60, title="Shared user cache ttl", ge=1)
+    revocation_filter_size: int = Field(
+        default=100000, title="Expected revoked tokens per worker", ge=1
+    )
+    revocation_filter_error_rate: float = Field(
+        default=0.001, title="Revoked tokens filter false positive rate", gt=0, lt=1
+    )
 
 
 auth_settings = AuthSettings()
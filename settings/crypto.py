@@ -0,0 +1,40 @@
+from typing import Literal
+
+from pydantic import Field
+from pydantic_settings import SettingsConfigDict
+
+from .base import BaseSettings
+
+
+class CryptoSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="crypto_")
+
+    scheme: Literal["bcrypt", "argon2"] = Field(
+        default="bcrypt", title="Password hashing scheme"
+    )
+    target_hash_time: float = Field(
+        default=0.25, title="Target password hash time in seconds", gt=0
+    )
+    cost: int | None = Field(
+        default=None, title="Fixed bcrypt rounds or argon2 time cost", ge=1
+    )
+    argon2_memory_cost: int = Field(
+        default=65536, title="Argon2 memory cost in KiB", ge=8
+    )
+
+    workers: int = Field(default=2, title="Password hashing process pool size", ge=1)
+    import_workers: int = Field(
+        default=1, title="Password hashing process pool size for imports", ge=1
+    )
+    max_concurrent_hashes: int = Field(
+        default=4, title="Max concurrent hashing requests per worker", ge=1
+    )
+    max_queued_hashes: int = Field(
+        default=16, title="Max hashing requests waiting for a slot per worker", ge=0
+    )
+    retry_after: int = Field(
+        default=1, title="Retry-After seconds for rejected hashing requests", ge=1
+    )
+
+
+crypto_settings = CryptoSettings()
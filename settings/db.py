@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import SettingsConfigDict
 
@@ -12,17 +14,49 @@ class DbSettings(BaseSettings):
     login: str = Field(default="postgres", title="Database login")
     password: str = Field(default="postgres", title="Database password")
     name: str = Field(default="auth", title="Database name")
+    pool_size: int = Field(default=10, title="Connections kept open per worker")
+    max_overflow: int = Field(
+        default=20, title="Connections opened above the pool size per worker"
+    )
+    external_pooler: bool = Field(
+        default=False,
+        title="Connect through a transaction pooler such as PgBouncer",
+    )
+    replica_hosts: list[str] = Field(
+        default=[], title="Read replica hosts, as host or host:port"
+    )
+    replica_strategy: Literal["round_robin", "least_connections"] = Field(
+        default="round_robin", title="Read replica balancing strategy"
+    )
+    replica_max_lag: float = Field(
+        default=5.0, title="Seconds a read replica can lag before leaving rotation"
+    )
+    replica_lag_check_interval: float = Field(
+        default=5.0, title="Seconds between read replica lag checks"
+    )
 
-    @property
-    def url(self) -> str:
+    def _url(self, host: str, port: int) -> str:
         return (
             f"postgresql+asyncpg://"
             f"{self.login}:"
             f"{self.password}@"
-            f"{self.host}:"
-            f"{self.port}/"
+            f"{host}:"
+            f"{port}/"
             f"{self.name}"
         )
 
+    @property
+    def url(self) -> str:
+        return self._url(host=self.host, port=self.port)
+
+    @property
+    def replica_urls(self) -> list[str]:
+        urls = []
+        for replica in self.replica_hosts:
+            host, _, port = replica.partition(":")
+            urls.append(self._url(host=host, port=int(port) if port else self.port))
+
+        return urls
+
 
 db_settings = DbSettings()
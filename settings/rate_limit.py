@@ -0,0 +1,36 @@
+from pydantic import Field, IPvAnyNetwork
+from pydantic_settings import SettingsConfigDict
+
+from .base import BaseSettings
+
+
+class RateLimitSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="rate_limit_")
+
+    enabled: bool = Field(default=True, title="Rate limiting enabled")
+    window: int = Field(default=60, title="Sliding window in seconds", ge=1)
+    trusted_proxies: list[IPvAnyNetwork] = Field(
+        default=[], title="Proxy networks whose client ip header is trusted"
+    )
+    client_ip_header: str = Field(
+        default="X-Forwarded-For", title="Header the proxies append the client ip to"
+    )
+
+    login_ip: int = Field(default=20, title="Logins per window per ip", ge=1)
+    login_email: int = Field(default=5, title="Logins per window per email", ge=1)
+    send_code_ip: int = Field(default=5, title="Sent codes per window per ip", ge=1)
+    send_code_email: int = Field(
+        default=3, title="Sent codes per window per email", ge=1
+    )
+    verify_ip: int = Field(
+        default=10, title="Verification attempts per window per ip", ge=1
+    )
+    verify_email: int = Field(
+        default=5, title="Verification attempts per window per email", ge=1
+    )
+    introspect_ip: int = Field(
+        default=1000, title="Introspections per window per ip", ge=1
+    )
+
+
+rate_limit_settings = RateLimitSettings()
@@ -13,5 +13,14 @@ class SMTPSettings(BaseSettings):
     username: str = Field(default="noreply@example.com", title="SMTP username")
     password: str = Field(default="", title="SMTP password")
 
+    batch_size: int = Field(default=10, title="Emails read per worker batch", ge=1)
+    max_attempts: int = Field(default=5, title="Delivery attempts per email", ge=1)
+    timeout: float = Field(default=10.0, title="SMTP timeout in seconds", gt=0)
+    claim_idle_time: int = Field(
+        default=60,
+        title="Seconds before failed or abandoned emails are retried",
+        ge=1,
+    )
+
 
 smtp_settings = SMTPSettings()
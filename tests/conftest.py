@@ -2,6 +2,7 @@ from typing import AsyncGenerator
 
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -9,6 +10,7 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 from testcontainers.postgres import PostgresContainer
+from testcontainers.redis import RedisContainer
 
 from api.dependencies import db
 from db.models import Base
@@ -21,6 +23,26 @@ async def postgres_container() -> AsyncGenerator[PostgresContainer, None]:
         yield postgres
 
 
+@pytest_asyncio.fixture(scope="session")
+async def redis_container() -> AsyncGenerator[RedisContainer, None]:
+    with RedisContainer(image="redis:8.2.1") as redis:
+        yield redis
+
+
+@pytest_asyncio.fixture(scope="function")
+async def test_redis(redis_container: RedisContainer) -> AsyncGenerator[Redis, None]:
+    client = Redis(
+        host=redis_container.get_container_host_ip(),
+        port=int(redis_container.get_exposed_port(6379)),
+        decode_responses=True,
+    )
+
+    yield client
+
+    await client.flushdb()
+    await client.aclose()
+
+
 @pytest_asyncio.fixture(scope="function")
 async def test_engine(
     postgres_container: PostgresContainer,
@@ -54,11 +76,22 @@ async def test_session(test_engine: AsyncEngine) -> AsyncGenerator[AsyncSession,
 
 
 @pytest_asyncio.fixture(scope="function")
-async def test_client(test_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
+async def test_client(
+    test_engine: AsyncEngine, test_session: AsyncSession
+) -> AsyncGenerator[AsyncClient, None]:
     def override_get_session():
         return test_session
 
+    def override_get_read_session_maker():
+        return async_sessionmaker(
+            test_engine, class_=AsyncSession, expire_on_commit=False
+        )
+
     app.dependency_overrides[db.get_session] = override_get_session
+    app.dependency_overrides[db.get_read_session] = override_get_session
+    app.dependency_overrides[db.get_read_session_maker] = (
+        override_get_read_session_maker
+    )
 
     async with AsyncClient(
         transport=ASGITransport(app=app), base_url="http://test"
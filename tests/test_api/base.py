@@ -5,8 +5,10 @@ from unittest import mock
 
 import pytest_asyncio
 from httpx import AsyncClient, Response
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from enums import RoleEnum
 from settings import auth_settings
 from tests.factories import UserFactory
 from utils.crypto import pwd_context
@@ -27,20 +29,9 @@ class BaseTestCase:
             yield mock_smtp
 
     @pytest_asyncio.fixture(autouse=True)
-    async def _mock_redis(self) -> AsyncGenerator[mock.MagicMock, None]:
-        redis_store = {}
-
-        async def mock_get(name):
-            return redis_store.get(name)
-
-        async def mock_setex(name, time, value):
-            redis_store[name] = value
-            return "OK"
-
-        with mock.patch("utils.redis.redis_client") as mock_redis:
-            mock_redis.get.side_effect = mock_get
-            mock_redis.setex.side_effect = mock_setex
-            yield mock_redis
+    async def _mock_redis(self, test_redis: Redis) -> AsyncGenerator[Redis, None]:
+        with mock.patch("utils.redis.redis_client", test_redis):
+            yield test_redis
 
     async def assert_response_ok(self, response: Response) -> dict:
         assert response.status_code == HTTPStatus.OK
@@ -57,6 +48,7 @@ class BaseTestCase:
         self,
         email: str | None = None,
         password: str = "secure_password123",
+        role: RoleEnum = RoleEnum.USER,
     ) -> tuple[dict, dict]:
         if email is None:
             email = f"user-{uuid.uuid4().hex[:8]}@example.com"
@@ -65,6 +57,7 @@ class BaseTestCase:
             session=self.session,
             email=email,
             hashed_password=pwd_context.hash(password),
+            role=role,
         )
 
         response = await self.client.post(
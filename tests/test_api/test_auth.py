@@ -1,13 +1,36 @@
+import asyncio
+import smtplib
 import uuid
+from http import HTTPStatus
+from ipaddress import ip_network
+from typing import Generator
 from unittest import mock
 
 import pytest
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
 
-from enums import RoleEnum
-from settings import auth_settings
-from tests.factories import UserFactory
+from db.models import Permission
+from db.repositories import UserRepository
+from enums import ActionEnum, ResourceEnum, RoleEnum
+from settings import auth_settings, rate_limit_settings, smtp_settings
+from tests.factories import PermissionFactory, UserFactory
 from tests.test_api.base import BaseTestCase
+from usecases import AuthUsecase
+from usecases.auth import _token_key, payload_cache, rehashing_users, revoked_tokens
+from usecases.user import user_cache
+from utils.admission import hash_admission
+from utils.cache import PermissionMatrix
 from utils.crypto import pwd_context
+from utils.redis import (
+    EMAIL_DEAD_STREAM,
+    EMAIL_GROUP,
+    EMAIL_STREAM,
+    create_email_group,
+    get_permission_version,
+    incr_permission_version,
+)
+from workers.email import EmailWorker
 
 
 class TestAuthRegister(BaseTestCase):
@@ -38,6 +61,17 @@ class TestAuthRegister(BaseTestCase):
         assert "hashed_password" not in data
         assert "password" not in data
 
+    @pytest.mark.asyncio
+    async def test_already_exists(self) -> None:
+        user_data = self._user_data()
+        await self.client.post(url=self.url, json=user_data)
+
+        response = await self.client.post(
+            url=self.url, json={**user_data, "email": user_data["email"].upper()}
+        )
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
 
 class TestAuthLogin(BaseTestCase):
     url = "/auth/login"
@@ -69,6 +103,251 @@ class TestAuthLogin(BaseTestCase):
         assert "token_type" in data
         assert data["token_type"] == auth_settings.token_type
 
+    @pytest.mark.asyncio
+    async def test_without_email(self) -> None:
+        response = await self.client.post(
+            url=self.url, json={"password": "secure_password123"}
+        )
+
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    @pytest.mark.asyncio
+    async def test_connection_released_while_hashing(self) -> None:
+        user_data = self._user_data()
+        await UserFactory.create_async(
+            session=self.session,
+            email=user_data["email"],
+            hashed_password=pwd_context.hash(user_data["password"]),
+        )
+        in_transaction = []
+
+        async def verify(secret: str, hash: str) -> bool:
+            in_transaction.append(self.session.in_transaction())
+            return pwd_context.verify(secret=secret, hash=hash)
+
+        with mock.patch("usecases.auth.crypto.verify", side_effect=verify):
+            response = await self.client.post(
+                url=self.url,
+                json={"email": user_data["email"], "password": user_data["password"]},
+            )
+
+        await self.assert_response_ok(response=response)
+        assert in_transaction == [False]
+
+    @pytest.mark.asyncio
+    async def test_outdated_hash_rehashed_once(self, test_engine: AsyncEngine) -> None:
+        user_data = self._user_data()
+        user = await UserFactory.create_async(
+            session=self.session,
+            email=user_data["email"],
+            hashed_password=pwd_context.hash(user_data["password"], rounds=4),
+        )
+        hashing = asyncio.Event()
+        new_hashed_password = pwd_context.hash(user_data["password"], rounds=5)
+
+        async def hash(secret: str) -> str:
+            await hashing.wait()
+            return new_hashed_password
+
+        with (
+            mock.patch("usecases.auth.crypto.needs_update", return_value=True),
+            mock.patch("usecases.auth.crypto.hash", side_effect=hash) as mock_hash,
+            mock.patch(
+                "usecases.auth.async_session",
+                async_sessionmaker(test_engine, expire_on_commit=False),
+            ),
+        ):
+            responses = [
+                await self.client.post(
+                    url=self.url,
+                    json={
+                        "email": user_data["email"],
+                        "password": user_data["password"],
+                    },
+                )
+                for _ in range(3)
+            ]
+            hashing.set()
+            await asyncio.gather(
+                *(
+                    task
+                    for task in asyncio.all_tasks()
+                    if task.get_name() == f"rehash-password-{user.id}"
+                )
+            )
+
+        for response in responses:
+            await self.assert_response_ok(response=response)
+        mock_hash.assert_called_once()
+        await self.session.refresh(user)
+        assert user.hashed_password == new_hashed_password
+        assert user.id not in rehashing_users
+
+    @pytest.mark.asyncio
+    async def test_overloaded(self) -> None:
+        user_data = self._user_data()
+
+        with (
+            mock.patch.object(hash_admission, "_semaphore", asyncio.Semaphore(0)),
+            mock.patch.object(hash_admission, "queue_size", 0),
+        ):
+            response = await self.client.post(
+                url=self.url,
+                json={"email": user_data["email"], "password": user_data["password"]},
+            )
+
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert response.headers["Retry-After"] == str(hash_admission.retry_after)
+
+    @pytest.mark.asyncio
+    async def test_rate_limited(self) -> None:
+        user_data = self._user_data()
+
+        responses = [
+            await self.client.post(
+                url=self.url,
+                json={"email": user_data["email"], "password": user_data["password"]},
+            )
+            for _ in range(rate_limit_settings.login_email + 1)
+        ]
+
+        assert {response.status_code for response in responses[:-1]} == {
+            HTTPStatus.UNAUTHORIZED
+        }
+        assert responses[-1].status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert int(responses[-1].headers["Retry-After"]) > 0
+
+    async def _login_from(self, forwarded_for: str) -> int:
+        response = await self.client.post(
+            url=self.url,
+            json={"email": self._user_data()["email"], "password": "password"},
+            headers={"X-Forwarded-For": forwarded_for},
+        )
+        return response.status_code
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_behind_proxy(self) -> None:
+        with mock.patch.object(
+            rate_limit_settings, "trusted_proxies", [ip_network("127.0.0.0/8")]
+        ):
+            statuses = [
+                await self._login_from(forwarded_for="203.0.113.1, 127.0.0.2")
+                for _ in range(rate_limit_settings.login_ip + 1)
+            ]
+            other_client = await self._login_from(forwarded_for="203.0.113.2")
+
+        assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS
+        assert other_client == HTTPStatus.UNAUTHORIZED
+
+    @pytest.mark.asyncio
+    async def test_forwarded_for_ignored_from_untrusted_client(self) -> None:
+        statuses = [
+            await self._login_from(forwarded_for=f"203.0.113.{i}")
+            for i in range(rate_limit_settings.login_ip + 1)
+        ]
+
+        assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS
+
+
+class TestAuthRefresh(BaseTestCase):
+    url = "/auth/refresh"
+
+    async def _login(self) -> dict:
+        email = f"john.doe-{uuid.uuid4().hex[:8]}@example.com"
+        await UserFactory.create_async(
+            session=self.session,
+            email=email,
+            hashed_password=pwd_context.hash("secure_password123"),
+        )
+
+        response = await self.client.post(
+            url="/auth/login",
+            json={"email": email, "password": "secure_password123"},
+        )
+        return await self.assert_response_ok(response=response)
+
+    @pytest.mark.asyncio
+    async def test_ok(self) -> None:
+        tokens = await self._login()
+
+        response = await self.client.post(
+            url=self.url, json={"refresh_token": tokens["refresh_token"]}
+        )
+
+        data = await self.assert_response_ok(response=response)
+        assert data["access_token"]
+        assert data["refresh_token"] != tokens["refresh_token"]
+
+    @pytest.mark.asyncio
+    async def test_reuse_revokes_tokens(self) -> None:
+        tokens = await self._login()
+        response = await self.client.post(
+            url=self.url, json={"refresh_token": tokens["refresh_token"]}
+        )
+        rotated = await self.assert_response_ok(response=response)
+
+        reuse_response = await self.client.post(
+            url=self.url, json={"refresh_token": tokens["refresh_token"]}
+        )
+        rotated_response = await self.client.post(
+            url=self.url, json={"refresh_token": rotated["refresh_token"]}
+        )
+
+        assert reuse_response.status_code == HTTPStatus.UNAUTHORIZED
+        assert rotated_response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+class TestAuthLogout(BaseTestCase):
+    url = "/auth/logout"
+
+    async def _create_permission(self) -> None:
+        await PermissionFactory.create_async(
+            session=self.session,
+            role=RoleEnum.USER,
+            action=ActionEnum.READ,
+            resource=ResourceEnum.USER,
+        )
+
+    @pytest.mark.asyncio
+    async def test_ok(self) -> None:
+        await self._create_permission()
+        _, headers = await self.create_user_and_get_token()
+
+        response = await self.client.post(url=self.url, headers=headers)
+        me_response = await self.client.get(url="/user/me", headers=headers)
+
+        await self.assert_response_no_content(response=response)
+        assert me_response.status_code == HTTPStatus.UNAUTHORIZED
+
+    @pytest.mark.asyncio
+    async def test_cached_payload_dropped(self) -> None:
+        await self._create_permission()
+        _, headers = await self.create_user_and_get_token()
+        key = _token_key(token=headers["Authorization"].split()[1])
+        await self.client.get(url="/user/me", headers=headers)
+        cached = payload_cache.get(key=key)
+
+        response = await self.client.post(url=self.url, headers=headers)
+
+        await self.assert_response_no_content(response=response)
+        assert cached is not None
+        assert payload_cache.get(key=key) is None
+
+    @pytest.mark.asyncio
+    async def test_revoked_in_other_worker(self) -> None:
+        await self._create_permission()
+        _, headers = await self.create_user_and_get_token()
+        await self.client.get(url="/user/me", headers=headers)
+
+        response = await self.client.post(url=self.url, headers=headers)
+        revoked_tokens.load(keys=[])
+        payload_cache.clear()
+        await AuthUsecase().load_revocations()
+        me_response = await self.client.get(url="/user/me", headers=headers)
+
+        await self.assert_response_no_content(response=response)
+        assert me_response.status_code == HTTPStatus.UNAUTHORIZED
+
 
 class TestAuthSendEmailCode(BaseTestCase):
     url = "/auth/send/{email}/code"
@@ -96,6 +375,98 @@ class TestAuthSendEmailCode(BaseTestCase):
 
         await self.assert_response_no_content(response=response)
 
+    @pytest.mark.asyncio
+    async def test_resend_coalesced(self, test_redis: Redis) -> None:
+        user_data = self._user_data()
+        await UserFactory.create_async(
+            session=self.session,
+            email=user_data["email"],
+            hashed_password=pwd_context.hash(user_data["password"]),
+            is_active=False,
+        )
+
+        responses = [
+            await self.client.post(url=self.url.format(email=user_data["email"]))
+            for _ in range(2)
+        ]
+
+        for response in responses:
+            await self.assert_response_no_content(response=response)
+        assert (
+            0
+            < responses[1].json()["retry_after"]
+            <= (auth_settings.verify_code_cooldown)
+        )
+        assert await test_redis.xlen(name=EMAIL_STREAM) == 1
+
+    @pytest.mark.asyncio
+    async def test_delivered_by_worker(self) -> None:
+        user_data = self._user_data()
+        await UserFactory.create_async(
+            session=self.session,
+            email=user_data["email"],
+            hashed_password=pwd_context.hash(user_data["password"]),
+            is_active=False,
+        )
+        await create_email_group()
+
+        response = await self.client.post(
+            url=self.url.format(email=user_data["email"]),
+        )
+        with mock.patch("smtplib.SMTP") as mock_smtp:
+            processed = await EmailWorker(consumer="test").process()
+
+        await self.assert_response_no_content(response=response)
+        assert processed == 1
+        mock_smtp.return_value.sendmail.assert_called_once()
+        assert (
+            mock_smtp.return_value.sendmail.call_args.kwargs["to_addrs"]
+            == user_data["email"]
+        )
+
+    @pytest.mark.asyncio
+    async def test_retried_then_dead_lettered(self, test_redis: Redis) -> None:
+        user_data = self._user_data()
+        await UserFactory.create_async(
+            session=self.session,
+            email=user_data["email"],
+            hashed_password=pwd_context.hash(user_data["password"]),
+            is_active=False,
+        )
+        await create_email_group()
+        await self.client.post(url=self.url.format(email=user_data["email"]))
+        worker = EmailWorker(consumer="test")
+        max_attempts = 2
+
+        with (
+            mock.patch("smtplib.SMTP") as mock_smtp,
+            mock.patch.object(smtp_settings, "max_attempts", max_attempts),
+            mock.patch.object(smtp_settings, "claim_idle_time", 0),
+        ):
+            mock_smtp.return_value.sendmail.side_effect = smtplib.SMTPException
+            first = await worker.process()
+            pending = await test_redis.xpending(
+                name=EMAIL_STREAM, groupname=EMAIL_GROUP
+            )
+            second = await worker.process()
+
+        assert (first, second) == (1, 1)
+        assert pending["pending"] == 1
+        assert mock_smtp.return_value.sendmail.call_count == max_attempts
+        assert await test_redis.xlen(name=EMAIL_STREAM) == 0
+        assert await test_redis.xlen(name=EMAIL_DEAD_STREAM) == 1
+
+    @pytest.mark.asyncio
+    async def test_unexpected_error_dead_lettered(self, test_redis: Redis) -> None:
+        await create_email_group()
+        await test_redis.xadd(name=EMAIL_STREAM, fields={"unexpected": "field"})
+
+        processed = await EmailWorker(consumer="test").process()
+
+        assert processed == 1
+        assert await test_redis.xlen(name=EMAIL_STREAM) == 0
+        assert await test_redis.xlen(name=EMAIL_DEAD_STREAM) == 1
+
 
 class TestAuthVerifyEmail(BaseTestCase):
     url = "/auth/verify/{email}/{code}"
@@ -127,3 +498,176 @@ class TestAuthVerifyEmail(BaseTestCase):
             )
 
         await self.assert_response_no_content(response=response)
+
+    @pytest.mark.asyncio
+    async def test_attempts_exhausted(self) -> None:
+        user_data = self._user_data()
+        await UserFactory.create_async(
+            session=self.session,
+            email=user_data["email"],
+            hashed_password=pwd_context.hash(user_data["password"]),
+            is_active=False,
+        )
+
+        with (
+            mock.patch(
+                "usecases.auth.AuthUsecase._generate_code", return_value=self.code
+            ),
+            mock.patch.object(auth_settings, "verify_code_max_attempts", 2),
+        ):
+            await self.client.post(url=f"/auth/send/{user_data['email']}/code")
+            responses = [
+                await self.client.post(
+                    url=self.url.format(email=user_data["email"], code=code)
+                )
+                for code in ("000000", "000001", self.code)
+            ]
+
+        assert {response.status_code for response in responses} == {
+            HTTPStatus.BAD_REQUEST
+        }
+
+
+class TestAuthIntrospect(BaseTestCase):
+    url = "/auth/introspect"
+    service_key = "gateway-key"
+
+    @pytest.fixture(autouse=True)
+    def _service_keys(self) -> Generator[None, None, None]:
+        with mock.patch.object(auth_settings, "service_keys", [self.service_key]):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_ok(self) -> None:
+        await PermissionFactory.create_async(
+            session=self.session,
+            role=RoleEnum.USER,
+            action=ActionEnum.READ,
+            resource=ResourceEnum.USER,
+        )
+        user, headers = await self.create_user_and_get_token()
+        token = headers["Authorization"].split()[1]
+
+        response = await self.client.post(
+            url=self.url,
+            json={
+                "tokens": [token, "invalid"],
+                "permissions": [
+                    {"action": ActionEnum.READ, "resource": ResourceEnum.USER},
+                    {"action": ActionEnum.DELETE, "resource": ResourceEnum.USER},
+                ],
+            },
+            headers={"X-Service-Key": self.service_key},
+        )
+
+        data = await self.assert_response_ok(response=response)
+        assert data[0]["active"] is True
+        assert data[0]["id"] == user["id"]
+        assert [grant["is_allowed"] for grant in data[0]["permissions"]] == [
+            True,
+            False,
+        ]
+        assert data[1]["active"] is False
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("headers", [{}, {"X-Service-Key": "unknown"}])
+    async def test_invalid_service_key(self, headers: dict) -> None:
+        response = await self.client.post(
+            url=self.url, json={"tokens": ["invalid"]}, headers=headers
+        )
+
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    @pytest.mark.asyncio
+    async def test_rate_limited(self) -> None:
+        responses = [
+            await self.client.post(
+                url=self.url,
+                json={"tokens": ["invalid"]},
+                headers={"X-Service-Key": self.service_key},
+            )
+            for _ in range(rate_limit_settings.introspect_ip + 1)
+        ]
+
+        assert {response.status_code for response in responses[:-1]} == {HTTPStatus.OK}
+        assert responses[-1].status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+
+class TestAuthPrincipal(BaseTestCase):
+    url = "/user/list"
+
+    async def _embedded_token(self) -> tuple[Permission, dict]:
+        permission = await PermissionFactory.create_async(
+            session=self.session,
+            role=RoleEnum.ADMIN,
+            action=ActionEnum.READ,
+            resource=ResourceEnum.USER,
+        )
+        with mock.patch.object(auth_settings, "embed_permissions", True):
+            _, headers = await self.create_user_and_get_token(role=RoleEnum.ADMIN)
+
+        return permission, headers
+
+    def _matrix(self, is_allowed: bool, version: int) -> PermissionMatrix:
+        matrix = PermissionMatrix()
+        matrix.load(
+            grants={(RoleEnum.ADMIN, ActionEnum.READ, ResourceEnum.USER): is_allowed},
+            version=version,
+        )
+        return matrix
+
+    @pytest.mark.asyncio
+    async def test_embedded_permissions_current_version(self) -> None:
+        _, headers = await self._embedded_token()
+        matrix = self._matrix(is_allowed=False, version=await get_permission_version())
+
+        with (
+            mock.patch("usecases.auth.permission_matrix", matrix),
+            mock.patch.object(UserRepository, "get_principal") as mock_get_principal,
+            mock.patch.object(UserRepository, "get_by_email") as mock_get_by_email,
+        ):
+            response = await self.client.get(url=self.url, headers=headers)
+
+        await self.assert_response_ok(response=response)
+        mock_get_principal.assert_not_called()
+        mock_get_by_email.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_embedded_permissions_stale_version(self) -> None:
+        _, headers = await self._embedded_token()
+        matrix = self._matrix(is_allowed=False, version=await incr_permission_version())
+
+        with mock.patch("usecases.auth.permission_matrix", matrix):
+            response = await self.client.get(url=self.url, headers=headers)
+
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    @pytest.mark.asyncio
+    async def test_embedded_permissions_matrix_not_loaded(self) -> None:
+        permission, headers = await self._embedded_token()
+        permission.is_active = False
+        await self.session.commit()
+
+        response = await self.client.get(url=self.url, headers=headers)
+
+        await self.assert_response_ok(response=response)
+
+        await incr_permission_version()
+        response = await self.client.get(url=self.url, headers=headers)
+
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    @pytest.mark.asyncio
+    async def test_user_cache_filled(self) -> None:
+        user, headers = await self.create_user_and_get_token(role=RoleEnum.ADMIN)
+        matrix = self._matrix(is_allowed=True, version=await get_permission_version())
+
+        with mock.patch("usecases.auth.permission_matrix", matrix):
+            await self.client.get(url=self.url, headers=headers)
+            assert await user_cache.get(email=user["email"]) is not None
+
+            with mock.patch.object(UserRepository, "get_by_email") as mock_get_by_email:
+                response = await self.client.get(url=self.url, headers=headers)
+
+        await self.assert_response_ok(response=response)
+        mock_get_by_email.assert_not_called()
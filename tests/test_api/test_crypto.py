@@ -0,0 +1,79 @@
+import uuid
+from typing import AsyncGenerator
+from unittest import mock
+
+import pytest
+import pytest_asyncio
+from redis.asyncio import Redis
+
+from settings import crypto_settings
+from tests.test_api.base import BaseTestCase
+from utils import crypto
+from utils.crypto import pwd_context
+from utils.redis import HASH_COST_KEY
+
+
+class TestCalibrate(BaseTestCase):
+    cost = 5
+
+    @pytest_asyncio.fixture(autouse=True)
+    async def _restore_policy(self) -> AsyncGenerator[None, None]:
+        policy = pwd_context.to_dict()
+        yield
+        pwd_context.load(policy)
+
+    @pytest.mark.asyncio
+    async def test_shared_cost(self, test_redis: Redis) -> None:
+        await test_redis.set(
+            name=HASH_COST_KEY.format(scheme=crypto_settings.scheme), value=self.cost
+        )
+
+        with mock.patch("utils.crypto.measure_cost") as mock_measure_cost:
+            policy = await crypto.calibrate()
+
+        mock_measure_cost.assert_not_called()
+        assert policy["bcrypt__rounds"] == self.cost
+
+    @pytest.mark.asyncio
+    async def test_measured_once(self, test_redis: Redis) -> None:
+        with mock.patch(
+            "utils.crypto.measure_cost", return_value=self.cost
+        ) as mock_measure_cost:
+            await crypto.calibrate()
+            policy = await crypto.calibrate()
+
+        mock_measure_cost.assert_called_once()
+        assert policy["bcrypt__rounds"] == self.cost
+        assert await test_redis.get(
+            name=HASH_COST_KEY.format(scheme=crypto_settings.scheme)
+        ) == str(self.cost)
+
+    @pytest.mark.asyncio
+    async def test_outdated_hash(self) -> None:
+        with mock.patch("utils.crypto.measure_cost", return_value=self.cost):
+            await crypto.calibrate()
+
+        assert crypto.needs_update(
+            hash=pwd_context.hash("secret", rounds=self.cost - 1)
+        )
+        assert not crypto.needs_update(hash=pwd_context.hash("secret"))
+
+    @pytest.mark.asyncio
+    async def test_argon2(self) -> None:
+        plain = uuid.uuid4().hex
+        bcrypt_hash = pwd_context.hash(plain)
+
+        with (
+            mock.patch.object(crypto_settings, "scheme", "argon2"),
+            mock.patch.object(crypto_settings, "argon2_memory_cost", 1024),
+            mock.patch.object(crypto_settings, "target_hash_time", 0.000001),
+        ):
+            policy = await crypto.calibrate()
+
+        argon2_hash = pwd_context.hash(plain)
+        assert policy["argon2__rounds"] == 1
+        assert pwd_context.identify(hash=argon2_hash) == "argon2"
+        assert pwd_context.verify(plain, argon2_hash)
+        assert pwd_context.verify(plain, bcrypt_hash)
+        assert crypto.needs_update(hash=bcrypt_hash)
+        assert not crypto.needs_update(hash=argon2_hash)
@@ -0,0 +1,36 @@
+from http import HTTPStatus
+from typing import Generator
+from unittest import mock
+
+import pytest
+
+from settings import auth_settings
+from tests.test_api.base import BaseTestCase
+
+
+class TestMetrics(BaseTestCase):
+    url = "/metrics"
+    service_key = "monitoring-key"
+
+    @pytest.fixture(autouse=True)
+    def _service_keys(self) -> Generator[None, None, None]:
+        with mock.patch.object(auth_settings, "service_keys", [self.service_key]):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_ok(self) -> None:
+        response = await self.client.get(
+            url=self.url, headers={"X-Service-Key": self.service_key}
+        )
+
+        data = await self.assert_response_ok(response=response)
+        assert data["hash_admission"]["active"] == 0
+        assert data["hash_admission"]["queued"] == 0
+        assert data["replicas"] == []
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("headers", [{}, {"X-Service-Key": "unknown"}])
+    async def test_invalid_service_key(self, headers: dict) -> None:
+        response = await self.client.get(url=self.url, headers=headers)
+
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
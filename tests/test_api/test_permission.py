@@ -1,8 +1,14 @@
+import asyncio
+from unittest import mock
+
 import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
 
 from enums import ActionEnum, ResourceEnum, RoleEnum
 from tests.factories import PermissionFactory
 from tests.test_api.base import BaseTestCase
+from usecases import PermissionUsecase
+from utils.cache import PermissionMatrix
 
 
 class TestPermissionList(BaseTestCase):
@@ -25,6 +31,21 @@ class TestPermissionList(BaseTestCase):
         assert isinstance(data, list)
         assert len(data) == 1
 
+    @pytest.mark.asyncio
+    async def test_permission_matrix(self) -> None:
+        matrix = PermissionMatrix()
+        matrix.load(
+            grants={(RoleEnum.USER, ActionEnum.READ, ResourceEnum.PERMISSION): True},
+            version=0,
+        )
+        _, headers = await self.create_user_and_get_token()
+
+        with mock.patch("usecases.auth.permission_matrix", matrix):
+            response = await self.client.get(url=self.url, headers=headers)
+
+        data = await self.assert_response_ok(response=response)
+        assert data == []
+
 
 class TestPermissionUpdate(BaseTestCase):
     url = "/permission"
@@ -55,3 +76,65 @@ class TestPermissionUpdate(BaseTestCase):
         assert data["action"] == ActionEnum.UPDATE.value
         assert data["resource"] == ResourceEnum.PERMISSION.value
         assert data["is_active"] is False
+
+    @pytest.mark.asyncio
+    async def test_matrix_reloaded(self, test_engine: AsyncEngine) -> None:
+        await PermissionFactory.create_async(
+            session=self.session,
+            role=RoleEnum.USER,
+            action=ActionEnum.UPDATE,
+            resource=ResourceEnum.PERMISSION,
+        )
+        await PermissionFactory.create_async(
+            session=self.session,
+            role=RoleEnum.USER,
+            action=ActionEnum.DELETE,
+            resource=ResourceEnum.USER,
+        )
+        _, headers = await self.create_user_and_get_token()
+        matrix = PermissionMatrix()
+
+        with (
+            mock.patch("usecases.permission.permission_matrix", matrix),
+            mock.patch(
+                "usecases.permission.async_session",
+                async_sessionmaker(test_engine, expire_on_commit=False),
+            ),
+        ):
+            task = asyncio.create_task(PermissionUsecase().watch_matrix())
+            try:
+                async with asyncio.timeout(5):
+                    while matrix.version is None:
+                        await asyncio.sleep(0.01)
+                loaded_version = matrix.version
+
+                response = await self.client.patch(
+                    url=self.url,
+                    params={
+                        "role": RoleEnum.USER.value,
+                        "action": ActionEnum.DELETE.value,
+                        "resource": ResourceEnum.USER.value,
+                    },
+                    json={"is_active": False},
+                    headers=headers,
+                )
+
+                async with asyncio.timeout(5):
+                    while matrix.version == loaded_version:
+                        await asyncio.sleep(0.01)
+            finally:
+                task.cancel()
+
+        await self.assert_response_ok(response=response)
+        assert matrix.version == loaded_version + 1
+        assert (
+            matrix.is_allowed(
+                role=RoleEnum.USER, action=ActionEnum.DELETE, resource=ResourceEnum.USER
+            )
+            is False
+        )
+        assert matrix.is_allowed(
+            role=RoleEnum.USER,
+            action=ActionEnum.UPDATE,
+            resource=ResourceEnum.PERMISSION,
+        )
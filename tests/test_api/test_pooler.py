@@ -0,0 +1,108 @@
+from typing import AsyncGenerator
+from unittest import mock
+
+import asyncpg
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import event, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from testcontainers.postgres import PostgresContainer
+
+from api.dependencies import db
+from db.models import User
+from db.sessions import build_engine
+from enums import ActionEnum, ResourceEnum, RoleEnum
+from main import app
+from settings import db_settings
+from tests.factories import PermissionFactory
+from tests.test_api.base import BaseTestCase
+
+
+def _prepare_default_statement_names(dbapi_connection, connection_record) -> None:
+    """Stand in for PgBouncer in transaction mode.
+
+    The pooler hands over server connections that other clients used without
+    resetting them, so the next prepared statement names asyncpg would pick by
+    default are already taken.
+
+    """
+    uid = asyncpg.connection._uid
+    dbapi_connection.run_async(
+        lambda connection: connection.execute(
+            ";".join(
+                f"PREPARE __asyncpg_stmt_{uid + i:x}__ AS SELECT 1"
+                for i in range(1, 100)
+            )
+        )
+    )
+
+
+class TestExternalPooler(BaseTestCase):
+    def _build_engine(
+        self, postgres_container: PostgresContainer, external_pooler: bool
+    ) -> AsyncEngine:
+        with mock.patch.object(db_settings, "external_pooler", external_pooler):
+            engine = build_engine(
+                url=postgres_container.get_connection_url().replace(
+                    "postgresql+psycopg2://", "postgresql+asyncpg://", 1
+                )
+            )
+
+        event.listen(engine.sync_engine, "connect", _prepare_default_statement_names)
+        return engine
+
+    @pytest_asyncio.fixture
+    async def pooler_engine(
+        self, postgres_container: PostgresContainer, test_client: AsyncClient
+    ) -> AsyncGenerator[AsyncEngine, None]:
+        engine = self._build_engine(
+            postgres_container=postgres_container, external_pooler=True
+        )
+        session_maker = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+        async def override_get_session() -> AsyncGenerator[AsyncSession, None]:
+            async with session_maker() as session:
+                yield session
+
+        app.dependency_overrides[db.get_session] = override_get_session
+        app.dependency_overrides[db.get_read_session] = override_get_session
+
+        yield engine
+
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_ok(self, pooler_engine: AsyncEngine) -> None:
+        await PermissionFactory.create_async(
+            session=self.session,
+            role=RoleEnum.USER,
+            action=ActionEnum.READ,
+            resource=ResourceEnum.USER,
+        )
+        user, headers = await self.create_user_and_get_token()
+
+        responses = [
+            await self.client.get(url="/user/me", headers=headers) for _ in range(3)
+        ]
+
+        for response in responses:
+            data = await self.assert_response_ok(response=response)
+            assert data["id"] == user["id"]
+
+    @pytest.mark.asyncio
+    async def test_default_mode_fails(
+        self, postgres_container: PostgresContainer
+    ) -> None:
+        engine = self._build_engine(
+            postgres_container=postgres_container, external_pooler=False
+        )
+
+        with pytest.raises(DBAPIError):
+            async with AsyncSession(engine) as session:
+                await session.scalars(select(User))
+
+        await engine.dispose()
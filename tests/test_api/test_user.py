@@ -1,8 +1,17 @@
+import json
+import uuid
+from http import HTTPStatus
+from unittest import mock
+
 import pytest
+from sqlalchemy import event
 
 from enums import ActionEnum, ResourceEnum, RoleEnum
-from tests.factories import PermissionFactory
+from settings import auth_settings
+from tests.factories import PermissionFactory, UserFactory
 from tests.test_api.base import BaseTestCase
+from usecases.user import user_cache
+from utils.crypto import pwd_context
 
 
 class TestUserMe(BaseTestCase):
@@ -24,6 +33,222 @@ class TestUserMe(BaseTestCase):
         assert data["id"] == user["id"]
         assert data["email"] == user["email"]
 
+    @pytest.mark.asyncio
+    async def test_single_query_without_matrix(self) -> None:
+        await PermissionFactory.create_async(
+            session=self.session,
+            role=RoleEnum.USER,
+            action=ActionEnum.READ,
+            resource=ResourceEnum.USER,
+        )
+        user, headers = await self.create_user_and_get_token()
+        statements: list[str] = []
+
+        def count(**kwargs) -> None:
+            statements.append(kwargs["statement"])
+
+        engine = self.session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", count, named=True)
+        try:
+            response = await self.client.get(url=self.url, headers=headers)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        data = await self.assert_response_ok(response=response)
+        assert data["id"] == user["id"]
+        assert len(statements) == 1
+        assert await user_cache.get(email=user["email"]) is not None
+
+
+class TestUserList(BaseTestCase):
+    url = "/user/list"
+
+    @pytest.mark.asyncio
+    async def test_ok(self) -> None:
+        await PermissionFactory.create_async(
+            session=self.session,
+            role=RoleEnum.ADMIN,
+            action=ActionEnum.READ,
+            resource=ResourceEnum.USER,
+        )
+        users = await UserFactory.create_batch_async(
+            session=self.session, size=3, role=RoleEnum.SUPPORT
+        )
+        _, headers = await self.create_user_and_get_token(role=RoleEnum.ADMIN)
+
+        first_response = await self.client.get(
+            url=self.url,
+            params={"role": RoleEnum.SUPPORT.value, "limit": 2},
+            headers=headers,
+        )
+        first_page = await self.assert_response_ok(response=first_response)
+        last_response = await self.client.get(
+            url=self.url,
+            params={
+                "role": RoleEnum.SUPPORT.value,
+                "limit": 2,
+                "cursor": first_page["next_cursor"],
+            },
+            headers=headers,
+        )
+        last_page = await self.assert_response_ok(response=last_response)
+
+        assert [user["id"] for user in first_page["items"] + last_page["items"]] == [
+            user.id for user in users
+        ]
+        assert last_page["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_role_not_allowed(self) -> None:
+        await PermissionFactory.create_async(
+            session=self.session,
+            role=RoleEnum.USER,
+            action=ActionEnum.READ,
+            resource=ResourceEnum.USER,
+        )
+        _, headers = await self.create_user_and_get_token()
+
+        response = await self.client.get(url=self.url, headers=headers)
+
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+class TestUserExport(BaseTestCase):
+    url = "/user/export"
+
+    @pytest.mark.asyncio
+    async def test_ok(self) -> None:
+        await PermissionFactory.create_async(
+            session=self.session,
+            role=RoleEnum.ADMIN,
+            action=ActionEnum.READ,
+            resource=ResourceEnum.USER,
+        )
+        users = await UserFactory.create_batch_async(
+            session=self.session, size=3, role=RoleEnum.SUPPORT
+        )
+        _, headers = await self.create_user_and_get_token(role=RoleEnum.ADMIN)
+
+        response = await self.client.get(
+            url=self.url, params={"role": RoleEnum.SUPPORT.value}, headers=headers
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["id"] for row in rows] == [user.id for user in users]
+        assert all("hashed_password" not in row for row in rows)
+
+
+class TestUserImport(BaseTestCase):
+    url = "/user/import"
+
+    @pytest.mark.asyncio
+    async def test_ok(self) -> None:
+        await PermissionFactory.create_async(
+            session=self.session,
+            role=RoleEnum.ADMIN,
+            action=ActionEnum.CREATE,
+            resource=ResourceEnum.USER,
+        )
+        existing_user = await UserFactory.create_async(session=self.session)
+        _, headers = await self.create_user_and_get_token(role=RoleEnum.ADMIN)
+        email = f"imported-{uuid.uuid4().hex[:8]}@example.com"
+        content = "\n".join(
+            [
+                "email,first_name,role,password,hashed_password",
+                f"{email},John,support,secure_password123,",
+                f"hashed-{email},Jane,,,{pwd_context.hash('secure_password123')}",
+                f"{existing_user.email},Jim,admin,secure_password123,",
+            ]
+        )
+
+        response = await self.client.post(
+            url=self.url,
+            params={"file_format": "csv"},
+            files={"file": ("users.csv", content, "text/csv")},
+            headers=headers,
+        )
+        login_response = await self.client.post(
+            url="/auth/login",
+            json={"email": email, "password": "secure_password123"},
+        )
+
+        data = await self.assert_response_ok(response=response)
+        assert data == {"received": 3, "imported": 2}
+        await self.assert_response_ok(response=login_response)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "row",
+        [
+            "@,secure_password123,",
+            "john@doe,secure_password123,",
+            "john.doe@example.com,,not-a-hash",
+        ],
+    )
+    async def test_invalid_user(self, row: str) -> None:
+        await PermissionFactory.create_async(
+            session=self.session,
+            role=RoleEnum.ADMIN,
+            action=ActionEnum.CREATE,
+            resource=ResourceEnum.USER,
+        )
+        _, headers = await self.create_user_and_get_token(role=RoleEnum.ADMIN)
+
+        response = await self.client.post(
+            url=self.url,
+            params={"file_format": "csv"},
+            files={
+                "file": (
+                    "users.csv",
+                    f"email,password,hashed_password\n{row}",
+                    "text/csv",
+                )
+            },
+            headers=headers,
+        )
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json()["detail"] == "Invalid user on line 2"
+
+    @pytest.mark.asyncio
+    async def test_no_transaction_while_hashing(self) -> None:
+        await PermissionFactory.create_async(
+            session=self.session,
+            role=RoleEnum.ADMIN,
+            action=ActionEnum.CREATE,
+            resource=ResourceEnum.USER,
+        )
+        _, headers = await self.create_user_and_get_token(role=RoleEnum.ADMIN)
+        content = "\n".join(
+            ["email,password"]
+            + [
+                f"imported-{uuid.uuid4().hex[:8]}@example.com,secure_password123"
+                for _ in range(3)
+            ]
+        )
+        in_transaction = []
+
+        async def hash_many(secrets: list[str]) -> list[str]:
+            in_transaction.append(self.session.in_transaction())
+            return [pwd_context.hash(secret) for secret in secrets]
+
+        with (
+            mock.patch("usecases.user.crypto.hash_many", side_effect=hash_many),
+            mock.patch("usecases.user.UserUsecase.import_users.__defaults__", (2,)),
+        ):
+            response = await self.client.post(
+                url=self.url,
+                params={"file_format": "csv"},
+                files={"file": ("users.csv", content, "text/csv")},
+                headers=headers,
+            )
+
+        data = await self.assert_response_ok(response=response)
+        assert data == {"received": 3, "imported": 3}
+        assert in_transaction == [False, False]
+
 
 class TestUserMeUpdate(BaseTestCase):
     url = "/user/me"
@@ -49,6 +274,37 @@ class TestUserMeUpdate(BaseTestCase):
         assert data["first_name"] == update_data["first_name"]
         assert data["last_name"] == update_data["last_name"]
 
+    @pytest.mark.asyncio
+    async def test_embedded_permissions(self) -> None:
+        permission = await PermissionFactory.create_async(
+            session=self.session,
+            role=RoleEnum.USER,
+            action=ActionEnum.UPDATE,
+            resource=ResourceEnum.USER,
+        )
+        with mock.patch.object(auth_settings, "embed_permissions", True):
+            user, headers = await self.create_user_and_get_token()
+
+        permission.is_active = False
+        await self.session.commit()
+
+        response = await self.client.patch(
+            url=self.url, json={"first_name": "Updated John"}, headers=headers
+        )
+
+        data = await self.assert_response_ok(response=response)
+        assert data["id"] == user["id"]
+
+        with mock.patch(
+            "usecases.auth.get_permission_version", return_value=1
+        ) as mock_version:
+            response = await self.client.patch(
+                url=self.url, json={"first_name": "Updated John"}, headers=headers
+            )
+
+        mock_version.assert_awaited_once()
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
 
 class TestUserMeDelete(BaseTestCase):
     url = "/user/me"
@@ -66,3 +322,22 @@ class TestUserMeDelete(BaseTestCase):
         response = await self.client.delete(url=self.url, headers=headers)
 
         await self.assert_response_no_content(response=response)
+
+    @pytest.mark.asyncio
+    async def test_cached_user_invalidated(self) -> None:
+        for action in (ActionEnum.READ, ActionEnum.DELETE):
+            await PermissionFactory.create_async(
+                session=self.session,
+                role=RoleEnum.USER,
+                action=action,
+                resource=ResourceEnum.USER,
+            )
+        _, headers = await self.create_user_and_get_token()
+
+        await self.assert_response_ok(
+            response=await self.client.get(url=self.url, headers=headers)
+        )
+        await self.client.delete(url=self.url, headers=headers)
+        response = await self.client.get(url=self.url, headers=headers)
+
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
@@ -0,0 +1,19 @@
+from itertools import product
+
+from constants import PERMISSION_BITS
+from enums import ActionEnum, ResourceEnum
+
+
+class TestPermissionBits:
+    def test_every_permission_has_a_bit(self) -> None:
+        assert set(PERMISSION_BITS) == set(product(ActionEnum, ResourceEnum))
+
+    def test_bits_unique(self) -> None:
+        bits = list(PERMISSION_BITS.values())
+
+        assert all(bit.bit_count() == 1 for bit in bits)
+        assert len(set(bits)) == len(bits)
+
+    def test_issued_bits_unchanged(self) -> None:
+        assert PERMISSION_BITS[(ActionEnum.READ, ResourceEnum.USER)] == 1 << 1
+        assert PERMISSION_BITS[(ActionEnum.READ, ResourceEnum.PERMISSION)] == 1 << 5
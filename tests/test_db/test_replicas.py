@@ -0,0 +1,139 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Literal, cast
+from unittest import mock
+
+import pytest
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from db import sessions
+from db.replicas import ReplicaPool
+
+MAX_LAG = 5.0
+
+
+class StubEngine:
+    """Stand in for a replica engine that answers the lag query with `lag`."""
+
+    def __init__(self, port: int, lag: float | None = 0.0):
+        self.url = make_url(f"postgresql+asyncpg://replica:{port}/db")
+        self.lag = lag
+
+    @asynccontextmanager
+    async def connect(self) -> AsyncGenerator[mock.Mock, None]:
+        if self.lag is None:
+            raise ConnectionRefusedError
+
+        result = mock.Mock()
+        result.scalar_one.return_value = self.lag
+        connection = mock.Mock()
+        connection.execute = mock.AsyncMock(return_value=result)
+        yield connection
+
+
+def _engine(port: int, lag: float | None = 0.0) -> AsyncEngine:
+    return cast("AsyncEngine", StubEngine(port=port, lag=lag))
+
+
+async def _checked_pool(
+    engines: list[AsyncEngine],
+    strategy: Literal["round_robin", "least_connections"] = "round_robin",
+) -> ReplicaPool:
+    pool = ReplicaPool(engines=engines, strategy=strategy, max_lag=MAX_LAG)
+    await pool.check_lag()
+    return pool
+
+
+class TestPick:
+    @pytest.mark.asyncio
+    async def test_round_robin(self) -> None:
+        first, second = _engine(port=1), _engine(port=2)
+        pool = await _checked_pool(engines=[first, second])
+
+        assert [pool.pick() for _ in range(4)] == [first, second, first, second]
+
+    @pytest.mark.asyncio
+    async def test_least_connections(self) -> None:
+        first, second = _engine(port=1), _engine(port=2)
+        pool = await _checked_pool(
+            engines=[first, second], strategy="least_connections"
+        )
+
+        async with pool.acquire() as busy:
+            assert busy is first
+            assert pool.pick() is second
+            assert [replica["active"] for replica in pool.stats()] == [1, 0]
+
+        assert [replica["active"] for replica in pool.stats()] == [0, 0]
+
+    @pytest.mark.asyncio
+    async def test_not_checked(self) -> None:
+        pool = ReplicaPool(
+            engines=[_engine(port=1)], strategy="round_robin", max_lag=MAX_LAG
+        )
+
+        assert pool.pick() is None
+        async with pool.acquire() as engine:
+            assert engine is None
+
+
+class TestCheckLag:
+    @pytest.mark.asyncio
+    async def test_lagging_removed_and_restored(self) -> None:
+        first, second = _engine(port=1), _engine(port=2, lag=MAX_LAG + 1)
+        pool = await _checked_pool(engines=[first, second])
+
+        assert {pool.pick() for _ in range(4)} == {first}
+
+        cast("StubEngine", second).lag = 0.0
+        await pool.check_lag()
+
+        assert {pool.pick() for _ in range(4)} == {first, second}
+
+    @pytest.mark.asyncio
+    async def test_unreachable_removed(self) -> None:
+        pool = await _checked_pool(engines=[_engine(port=1, lag=None)])
+
+        assert pool.pick() is None
+        assert pool.stats()[0]["lag"] is None
+        assert pool.stats()[0]["in_rotation"] is False
+
+    @pytest.mark.asyncio
+    async def test_watch_lag(self) -> None:
+        engine = _engine(port=1, lag=MAX_LAG + 1)
+        pool = ReplicaPool(engines=[engine], strategy="round_robin", max_lag=MAX_LAG)
+        task = asyncio.create_task(pool.watch_lag(interval=0.01))
+
+        try:
+            await asyncio.sleep(0.05)
+            assert pool.pick() is None
+
+            cast("StubEngine", engine).lag = 0.0
+            await asyncio.sleep(0.05)
+            assert pool.pick() is engine
+        finally:
+            task.cancel()
+
+
+class TestReadSession:
+    @pytest.mark.asyncio
+    async def test_replica(self) -> None:
+        engine = create_async_engine(url="postgresql+asyncpg://replica:1/db")
+        pool = ReplicaPool(engines=[engine], strategy="round_robin", max_lag=MAX_LAG)
+        pool._lags[engine] = 0.0
+
+        with mock.patch.object(sessions, "replicas", pool):
+            async with sessions.read_session() as session:
+                assert session.bind is engine
+                assert pool.stats()[0]["active"] == 1
+
+        assert pool.stats()[0]["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_primary_fallback(self) -> None:
+        pool = await _checked_pool(engines=[_engine(port=1, lag=None)])
+
+        with mock.patch.object(sessions, "replicas", pool):
+            async with sessions.read_session() as session:
+                assert session.bind is sessions.async_engine
@@ -0,0 +1,202 @@
+import itertools
+import uuid
+
+import pytest
+from sqlalchemy import and_, false, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import Permission, User
+from db.repositories import PermissionRepository, UserRepository
+from enums import ActionEnum, ResourceEnum, RoleEnum
+from tests.factories import PermissionFactory, UserFactory
+
+
+class TestUpdateMany:
+    @pytest.mark.asyncio
+    async def test_ok(self, test_session: AsyncSession) -> None:
+        for role, action in (
+            (RoleEnum.USER, ActionEnum.READ),
+            (RoleEnum.USER, ActionEnum.UPDATE),
+            (RoleEnum.ADMIN, ActionEnum.UPDATE),
+        ):
+            await PermissionFactory.create_async(
+                session=test_session,
+                role=role,
+                action=action,
+                resource=ResourceEnum.PERMISSION,
+            )
+
+        permissions = await PermissionRepository().update_many(
+            session=test_session,
+            data={"is_active": False},
+            role=RoleEnum.USER,
+            resource=ResourceEnum.PERMISSION,
+        )
+        admin_permission = await PermissionRepository().get_by(
+            session=test_session,
+            role=RoleEnum.ADMIN,
+            action=ActionEnum.UPDATE,
+            resource=ResourceEnum.PERMISSION,
+        )
+
+        assert {permission.action for permission in permissions} == {
+            ActionEnum.READ,
+            ActionEnum.UPDATE,
+        }
+        assert all(not permission.is_active for permission in permissions)
+        assert admin_permission is not None
+        assert admin_permission.is_active
+
+
+class TestCreateMany:
+    @pytest.mark.asyncio
+    async def test_input_order(self, test_session: AsyncSession) -> None:
+        suffix = uuid.uuid4().hex[:8]
+        emails = [f"{name}-{suffix}@example.com" for name in "edcbafg"]
+
+        users = await UserRepository().create_many(
+            session=test_session,
+            data=[{"email": email, "role": RoleEnum.USER} for email in emails],
+            chunk_size=3,
+        )
+
+        assert [user.email for user in users] == emails
+        assert all(user.id is not None for user in users)
+
+
+class TestPrebuiltStatements:
+    async def _create_users(self, session: AsyncSession) -> list[User]:
+        await PermissionFactory.create_async(
+            session=session,
+            role=RoleEnum.USER,
+            action=ActionEnum.READ,
+            resource=ResourceEnum.USER,
+        )
+        await PermissionFactory.create_async(
+            session=session,
+            role=RoleEnum.USER,
+            action=ActionEnum.UPDATE,
+            resource=ResourceEnum.USER,
+            is_active=False,
+        )
+        suffix = uuid.uuid4().hex[:8]
+        return [
+            await UserFactory.create_async(
+                session=session, email=f"{name}-{suffix}@example.com", role=role
+            )
+            for name, role in (("John", RoleEnum.USER), ("jane", RoleEnum.ADMIN))
+        ]
+
+    @pytest.mark.asyncio
+    async def test_get_by_email(self, test_session: AsyncSession) -> None:
+        users = await self._create_users(session=test_session)
+
+        for email in [user.email.upper() for user in users] + ["unknown@example.com"]:
+            inline = await test_session.scalar(
+                select(User).where(func.lower(User.email) == email.lower())
+            )
+            prebuilt = await UserRepository().get_by_email(
+                session=test_session, email=email
+            )
+
+            assert prebuilt is inline
+
+    @pytest.mark.asyncio
+    async def test_get_principal(self, test_session: AsyncSession) -> None:
+        users = await self._create_users(session=test_session)
+
+        for email, action in itertools.product(
+            [user.email for user in users] + ["unknown@example.com"],
+            (ActionEnum.READ, ActionEnum.UPDATE, ActionEnum.DELETE),
+        ):
+            inline = (
+                await test_session.execute(
+                    select(
+                        User.id,
+                        User.email,
+                        User.role,
+                        User.is_active,
+                        func.coalesce(Permission.is_active, false()).label(
+                            "is_allowed"
+                        ),
+                    )
+                    .outerjoin(
+                        Permission,
+                        and_(
+                            Permission.role == User.role,
+                            Permission.action == action,
+                            Permission.resource == ResourceEnum.USER,
+                        ),
+                    )
+                    .where(func.lower(User.email) == email.lower())
+                )
+            ).one_or_none()
+            prebuilt = await UserRepository().get_principal(
+                session=test_session,
+                email=email,
+                action=action,
+                resource=ResourceEnum.USER,
+            )
+
+            assert prebuilt == inline
+
+    @pytest.mark.asyncio
+    async def test_get_principals(self, test_session: AsyncSession) -> None:
+        users = await self._create_users(session=test_session)
+        emails = [user.email.upper() for user in users] + ["unknown@example.com"]
+
+        inline = await test_session.execute(
+            select(User.id, User.email, User.role, User.is_active).where(
+                func.lower(User.email).in_([email.lower() for email in emails])
+            )
+        )
+        prebuilt = await UserRepository().get_principals(
+            session=test_session, emails=emails
+        )
+
+        assert sorted(prebuilt) == sorted(inline.all())
+        assert len(prebuilt) == len(users)
+
+    @pytest.mark.asyncio
+    async def test_get_by_key(self, test_session: AsyncSession) -> None:
+        await self._create_users(session=test_session)
+
+        for action in (ActionEnum.READ, ActionEnum.UPDATE, ActionEnum.DELETE):
+            inline = await test_session.scalar(
+                select(Permission).filter_by(
+                    role=RoleEnum.USER, action=action, resource=ResourceEnum.USER
+                )
+            )
+            prebuilt = await PermissionRepository().get_by_key(
+                session=test_session,
+                role=RoleEnum.USER,
+                action=action,
+                resource=ResourceEnum.USER,
+            )
+
+            assert prebuilt is inline
+
+    @pytest.mark.asyncio
+    async def test_get_with_permission(self, test_session: AsyncSession) -> None:
+        users = await self._create_users(session=test_session)
+
+        for user, action in itertools.product(
+            users, (ActionEnum.READ, ActionEnum.UPDATE, ActionEnum.DELETE)
+        ):
+            principal = await UserRepository().get_principal(
+                session=test_session,
+                email=user.email,
+                action=action,
+                resource=ResourceEnum.USER,
+            )
+            row = await UserRepository().get_with_permission(
+                session=test_session,
+                email=user.email.upper(),
+                action=action,
+                resource=ResourceEnum.USER,
+            )
+
+            assert principal is not None
+            assert row is not None
+            assert row.User is user
+            assert row.is_allowed == principal.is_allowed
@@ -0,0 +1,33 @@
+import time
+
+from utils.cache import LRUCache
+
+
+class TestLRUCache:
+    def test_expired(self) -> None:
+        cache: LRUCache[str] = LRUCache(maxsize=2)
+        cache.set(key="expired", value="value", expires_at=time.time() - 1)
+        cache.set(key="valid", value="value", expires_at=time.time() + 60)
+
+        assert cache.get(key="expired") is None
+        assert cache.get(key="valid") == "value"
+        assert cache.stats() == {"size": 1, "maxsize": 2, "hits": 1, "misses": 1}
+
+    def test_least_recently_used_evicted(self) -> None:
+        cache: LRUCache[str] = LRUCache(maxsize=2)
+        expires_at = time.time() + 60
+        for key in ("first", "second"):
+            cache.set(key=key, value=key, expires_at=expires_at)
+
+        cache.get(key="first")
+        cache.set(key="third", value="third", expires_at=expires_at)
+
+        assert cache.get(key="second") is None
+        assert cache.get(key="first") == "first"
+        assert cache.get(key="third") == "third"
+
+    def test_disabled(self) -> None:
+        cache: LRUCache[str] = LRUCache(maxsize=0)
+        cache.set(key="key", value="value", expires_at=time.time() + 60)
+
+        assert cache.get(key="key") is None
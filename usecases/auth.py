@@ -1,24 +1,58 @@
+import asyncio
+import hashlib
 import secrets
+import time
 from datetime import UTC, datetime, timedelta
+from typing import Any
 
 from jose import JWTError, jwt
+from loguru import logger
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from constants import PERMISSION_BITS
 from db.models import User
 from db.repositories import PermissionRepository, UserRepository
+from db.sessions import async_session, release
 from enums import ActionEnum, ResourceEnum, RoleEnum
 from exceptions import (
     AuthCodeInvalidError,
     AuthCredentialsError,
     AuthPermissionsError,
+    ServiceOverloadedError,
     UserAlreadyActiveError,
     UserAlreadyExistsError,
     UserNotFoundError,
 )
 from settings import auth_settings
-from utils.crypto import pwd_context
+from usecases.permission import permission_matrix
+from usecases.user import user_cache
+from utils import crypto, tasks
+from utils.admission import hash_admission
+from utils.cache import BloomFilter, LRUCache
 from utils.email import send_email
-from utils.redis import get_verify_code, set_verify_code
+from utils.redis import (
+    consume_verify_code,
+    get_permission_version,
+    is_token_id_revoked,
+    issue_verify_code,
+    read_revoked_token_ids,
+    revoke_refresh_tokens,
+    revoke_token_id,
+    rotate_refresh_token,
+    set_refresh_token,
+)
+
+payload_cache: LRUCache[dict] = LRUCache(maxsize=auth_settings.token_cache_size)
+revoked_tokens = BloomFilter(
+    capacity=auth_settings.revocation_filter_size,
+    error_rate=auth_settings.revocation_filter_error_rate,
+)
+rehashing_users: set[int] = set()
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
 
 
 class AuthUsecase:
@@ -47,7 +81,7 @@ class AuthUsecase:
                 minutes=auth_settings.access_token_expire_minutes
             )
 
-        to_encode.update({"exp": expire})
+        to_encode.update({"exp": expire, "jti": secrets.token_urlsafe(16)})
 
         return jwt.encode(
             claims=to_encode,
@@ -58,6 +92,8 @@ class AuthUsecase:
     def get_payload(self, token: str) -> dict:
         """Get the payload from the token.
 
+        Decoded payloads are cached until the token expires.
+
         Args:
             token: The token.
 
@@ -68,8 +104,14 @@ class AuthUsecase:
             AuthCredentialsError: If the token is invalid.
 
         """
+        key = _token_key(token=token)
+
+        payload = payload_cache.get(key=key)
+        if payload is not None:
+            return payload
+
         try:
-            return jwt.decode(
+            payload = jwt.decode(
                 token=token,
                 key=auth_settings.secret_key,
                 algorithms=[auth_settings.algorithm],
@@ -77,6 +119,109 @@ class AuthUsecase:
         except JWTError as e:
             raise AuthCredentialsError from e
 
+        if isinstance(expires_at := payload.get("exp"), int | float):
+            payload_cache.set(key=key, value=payload, expires_at=expires_at)
+
+        return payload
+
+    @staticmethod
+    def forget_payload(token: str) -> None:
+        """Drop the cached payload of the token.
+
+        Args:
+            token: The token.
+
+        """
+        payload_cache.delete(key=_token_key(token=token))
+
+    async def get_active_payload(self, token: str) -> dict:
+        """Get the payload from the token and check it is not revoked.
+
+        Only tokens matched by the revoked tokens filter are checked in redis.
+
+        Args:
+            token: The token.
+
+        Returns:
+            The payload.
+
+        Raises:
+            AuthCredentialsError: If the token is invalid or revoked.
+
+        """
+        payload = self.get_payload(token=token)
+
+        jti = payload.get("jti")
+        if (
+            jti is not None
+            and revoked_tokens.might_contain(key=jti)
+            and await is_token_id_revoked(jti=jti)
+        ):
+            self.forget_payload(token=token)
+            raise AuthCredentialsError
+
+        return payload
+
+    async def revoke(self, token: str) -> None:
+        """Revoke the token until it expires.
+
+        Args:
+            token: The token.
+
+        Raises:
+            AuthCredentialsError: If the token is invalid or has no id.
+
+        """
+        payload = await self.get_active_payload(token=token)
+
+        jti = payload.get("jti")
+        if jti is None:
+            raise AuthCredentialsError
+
+        await revoke_token_id(jti=jti, ttl=int(payload["exp"] - time.time()) + 1)
+        revoked_tokens.add(key=jti)
+        self.forget_payload(token=token)
+
+    async def load_revocations(self) -> str:
+        """Load all revoked token ids into the revoked tokens filter.
+
+        Returns:
+            The stream id of the last loaded revocation.
+
+        """
+        last_id, token_ids = await read_revoked_token_ids(last_id="0")
+        revoked_tokens.load(keys=token_ids)
+
+        return last_id
+
+    async def watch_revocations(
+        self, last_id: str = "0", block: int = 10000, retry_delay: float = 1.0
+    ) -> None:
+        """Add every new revoked token id to the revoked tokens filter.
+
+        The filter is rebuilt from the revocations of tokens that may not be
+        expired once it holds more keys than its capacity.
+
+        Args:
+            last_id: The stream id of the last loaded revocation.
+            block: The milliseconds to wait for new revocations per read.
+            retry_delay: The delay before reading again after a redis error.
+
+        """
+        while True:
+            try:
+                last_id, token_ids = await read_revoked_token_ids(
+                    last_id=last_id, block=block
+                )
+                for jti in token_ids:
+                    revoked_tokens.add(key=jti)
+
+                if revoked_tokens.count > revoked_tokens.capacity:
+                    last_id = await self.load_revocations()
+            except RedisError as e:
+                logger.warning(f"Revoked tokens read failed: {e}")
+                await asyncio.sleep(retry_delay)
+
     @staticmethod
     def _generate_code() -> str:
         """Generate a code.
@@ -88,10 +233,12 @@ class AuthUsecase:
         return str(secrets.randbelow(900000) + 100000)
 
     async def _authenticate(
-        self, session: AsyncSession, email: str, password: str
+        self, session: AsyncSession, email: str | None, password: str
     ) -> User:
         """Authenticate a user.
 
+        The connection is returned to the pool before the password is verified.
+
         Args:
             session: The session.
             email: The email.
@@ -104,18 +251,67 @@ class AuthUsecase:
             AuthCredentialsError: If the user is not authenticated.
 
         """
-        user = await self._user_repository.get_by(session=session, email=email)
+        if email is None:
+            raise AuthCredentialsError
+
+        user = await self._user_repository.get_by_email(session=session, email=email)
+        await release(session=session)
 
         if (
             not user
             or not user.is_active
             or not user.hashed_password
-            or not pwd_context.verify(secret=password, hash=user.hashed_password)
+            or not await crypto.verify(secret=password, hash=user.hashed_password)
         ):
             raise AuthCredentialsError
 
+        if (
+            crypto.needs_update(hash=user.hashed_password)
+            and user.id not in rehashing_users
+        ):
+            rehashing_users.add(user.id)
+            tasks.spawn(
+                self._rehash_password(
+                    user_id=user.id,
+                    password=password,
+                    hashed_password=user.hashed_password,
+                ),
+                name=f"rehash-password-{user.id}",
+            )
+
         return user
 
+    async def _rehash_password(
+        self, user_id: int, password: str, hashed_password: str
+    ) -> None:
+        """Rehash a password with the current policy and store it.
+
+        One rehash per user runs at a time in a worker, within the hashing
+        admission, and is skipped when overloaded, the next login retries it. The
+        hash is only replaced if the password was not changed meanwhile.
+
+        Args:
+            user_id: The user id.
+            password: The password.
+            hashed_password: The outdated hashed password.
+
+        """
+        try:
+            async with hash_admission.admit():
+                new_hashed_password = await crypto.hash(secret=password)
+
+            async with async_session() as session:
+                await self._user_repository.update_by(
+                    session=session,
+                    data={"hashed_password": new_hashed_password},
+                    id=user_id,
+                    hashed_password=hashed_password,
+                )
+        except ServiceOverloadedError:
+            logger.info(f"Password rehash of user {user_id} skipped, overloaded")
+        finally:
+            rehashing_users.discard(user_id)
+
     async def _get_user_by_email(self, session: AsyncSession, email: str) -> User:
         """Get a user by email.
 
@@ -130,12 +326,35 @@ class AuthUsecase:
             UserNotFoundError: If the user is not found.
 
         """
-        user = await self._user_repository.get_by(session=session, email=email)
+        user = await self._user_repository.get_by_email(session=session, email=email)
         if not user:
             raise UserNotFoundError
 
         return user
 
+    async def _get_cached_user(self, session: AsyncSession, email: str) -> User | None:
+        """Get a user by email through the user cache.
+
+        Args:
+            session: The session.
+            email: The email.
+
+        Returns:
+            The user.
+
+        """
+        user = await user_cache.get(email=email)
+
+        if user is None:
+            user = await self._user_repository.get_by_email(
+                session=session, email=email
+            )
+
+            if user:
+                await user_cache.set(user=user)
+
+        return user
+
     async def get_current_user(
         self,
         session: AsyncSession,
@@ -145,6 +364,10 @@ class AuthUsecase:
     ) -> User:
         """Get the current user and check permissions.
 
+        The user is read through the user cache, so the returned user may not be
+        attached to the session. On a miss while the permission matrix is not loaded,
+        the user and the permission are read in a single query.
+
         Args:
             session: The session.
             token: The token.
@@ -159,27 +382,266 @@ class AuthUsecase:
             AuthPermissionsError: If the user don't have permission to call the action.
 
         """
-        payload = self.get_payload(token=token)
+        payload = await self.get_active_payload(token=token)
         email = payload.get("sub")
 
         if email is None:
             raise AuthCredentialsError
 
-        user = await self._user_repository.get_by(session=session, email=email)
+        is_allowed: bool | None = None
+        user = await user_cache.get(email=email)
+
+        if user is None:
+            if permission_matrix.version is None:
+                row = await self._user_repository.get_with_permission(
+                    session=session, email=email, action=action, resource=resource
+                )
+                if row is not None:
+                    user, is_allowed = row
+            else:
+                user = await self._user_repository.get_by_email(
+                    session=session, email=email
+                )
+
+            if user:
+                await user_cache.set(user=user)
 
         if not user or not user.is_active:
             raise AuthCredentialsError
 
-        permission = await self._permission_repository.get_by(
-            session=session, role=user.role, action=action, resource=resource
-        )
+        if is_allowed is None:
+            is_allowed = permission_matrix.is_allowed(
+                role=user.role, action=action, resource=resource
+            )
+        if is_allowed is None:
+            permission = await self._permission_repository.get_by_key(
+                session=session, role=user.role, action=action, resource=resource
+            )
+            is_allowed = permission is not None and permission.is_active
 
-        if permission and not permission.is_active or not permission:
+        if not is_allowed:
             raise AuthPermissionsError
 
         return user
 
-    async def login(self, session: AsyncSession, email: str, password: str) -> str:
+    async def get_principal(
+        self,
+        session: AsyncSession,
+        token: str,
+        action: ActionEnum,
+        resource: ResourceEnum,
+    ) -> dict[str, Any]:
+        """Get the id, email and role of the current user and check permissions.
+
+        Tokens with embedded permissions of the current permission version are
+        authorized without the database. Others are checked against the user cache,
+        filled on a miss, and the permission matrix, or against the database in a
+        single query while the matrix is not loaded.
+
+        Args:
+            session: The session.
+            token: The token.
+            action: The action.
+            resource: The resource.
+
+        Returns:
+            The principal.
+
+        Raises:
+            AuthCredentialsError: If the token is invalid.
+            AuthPermissionsError: If the user don't have permission to call the action.
+
+        """
+        payload = await self.get_active_payload(token=token)
+
+        if "perms" in payload and payload.get("pv") == (
+            permission_matrix.version
+            if permission_matrix.version is not None
+            else await get_permission_version()
+        ):
+            if not payload["perms"] & PERMISSION_BITS[(action, resource)]:
+                raise AuthPermissionsError
+
+            return {
+                "id": payload["uid"],
+                "email": payload["sub"],
+                "role": payload["role"],
+            }
+
+        email = payload.get("sub")
+
+        if email is None:
+            raise AuthCredentialsError
+
+        principal: Any
+        if permission_matrix.version is None:
+            principal = await self._user_repository.get_principal(
+                session=session, email=email, action=action, resource=resource
+            )
+        else:
+            principal = await self._get_cached_user(session=session, email=email)
+
+        if not principal or not principal.is_active:
+            raise AuthCredentialsError
+
+        is_allowed = permission_matrix.is_allowed(
+            role=principal.role, action=action, resource=resource
+        )
+        if is_allowed is None:
+            is_allowed = principal.is_allowed
+
+        if not is_allowed:
+            raise AuthPermissionsError
+
+        return {"id": principal.id, "email": principal.email, "role": principal.role}
+
+    async def introspect(
+        self,
+        session: AsyncSession,
+        tokens: list[str],
+        permissions: list[dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        """Validate tokens and check permissions of their users in one pass.
+
+        Users are resolved with one query, permissions with the permission matrix
+        or one more query.
+
+        Args:
+            session: The session.
+            tokens: The tokens.
+            permissions: The actions and resources to check for every token.
+
+        Returns:
+            The introspection of every token, in the same order.
+
+        """
+        emails: list[str | None] = []
+        for token in tokens:
+            try:
+                emails.append((await self.get_active_payload(token=token)).get("sub"))
+            except AuthCredentialsError:
+                emails.append(None)
+
+        requested = list({email for email in emails if email is not None})
+        users = {
+            user.email: user
+            for user in (
+                await self._user_repository.get_principals(
+                    session=session, emails=requested
+                )
+                if requested
+                else []
+            )
+            if user.is_active
+        }
+
+        grants: dict[tuple[str, str, str], bool] = {}
+        roles = list({user.role for user in users.values()})
+        if permissions and roles and permission_matrix.version is None:
+            grants = {
+                (permission.role, permission.action, permission.resource): (
+                    permission.is_active
+                )
+                for permission in await self._permission_repository.get_all_by_roles(
+                    session=session, roles=roles
+                )
+            }
+
+        def is_allowed(role: str, action: str, resource: str) -> bool:
+            allowed = permission_matrix.is_allowed(
+                role=role, action=action, resource=resource
+            )
+            if allowed is None:
+                allowed = grants.get((role, action, resource), False)
+
+            return allowed
+
+        result = []
+        for email in emails:
+            user = users.get(email) if email is not None else None
+            if user is None:
+                result.append({"active": False})
+                continue
+
+            result.append(
+                {
+                    "active": True,
+                    "id": user.id,
+                    "email": user.email,
+                    "role": user.role,
+                    "permissions": [
+                        {
+                            **permission,
+                            "is_allowed": is_allowed(role=user.role, **permission),
+                        }
+                        for permission in permissions
+                    ],
+                }
+            )
+
+        return result
+
+    async def _get_permission_claims(
+        self, session: AsyncSession, user: User
+    ) -> dict[str, Any]:
+        """Get the token claims with the id, role and permissions of a user.
+
+        Args:
+            session: The session.
+            user: The user.
+
+        Returns:
+            The claims.
+
+        """
+        version = await get_permission_version()
+        permissions = await self._permission_repository.get_all(
+            session=session, role=user.role, is_active=True
+        )
+
+        return {
+            "uid": user.id,
+            "role": user.role,
+            "perms": sum(
+                PERMISSION_BITS[(permission.action, permission.resource)]
+                for permission in permissions
+            ),
+            "pv": version,
+        }
+
+    async def _issue_tokens(self, session: AsyncSession, user: User) -> dict[str, str]:
+        """Issue an access token and a refresh token for a user.
+
+        Args:
+            session: The session.
+            user: The user.
+
+        Returns:
+            The access token and the refresh token.
+
+        """
+        claims: dict[str, Any] = {"sub": user.email}
+        if auth_settings.embed_permissions:
+            claims.update(await self._get_permission_claims(session=session, user=user))
+
+        refresh_token = secrets.token_urlsafe(32)
+        await set_refresh_token(
+            digest=_token_key(token=refresh_token), email=user.email
+        )
+
+        return {
+            "access_token": self._create_access_token(
+                data=claims,
+                expires_delta=timedelta(
+                    minutes=auth_settings.access_token_expire_minutes
+                ),
+            ),
+            "refresh_token": refresh_token,
+        }
+
+    async def login(
+        self, session: AsyncSession, email: str | None, password: str
+    ) -> dict[str, str]:
         """Login a user.
 
         Args:
@@ -188,7 +650,7 @@ class AuthUsecase:
             password: The password.
 
         Returns:
-            The token.
+            The access token and the refresh token.
 
         Raises:
             AuthCredentialsError: If the user is not authenticated.
@@ -203,11 +665,62 @@ class AuthUsecase:
         if not user:
             raise AuthCredentialsError
 
-        return self._create_access_token(
-            data={"sub": user.email},
-            expires_delta=timedelta(minutes=auth_settings.access_token_expire_minutes),
+        return await self._issue_tokens(session=session, user=user)
+
+    async def refresh(
+        self, session: AsyncSession, refresh_token: str
+    ) -> dict[str, str]:
+        """Exchange a refresh token for new tokens.
+
+        Every refresh token can be used once. Reusing one revokes all refresh tokens
+        of its owner, as the token was likely stolen.
+
+        Args:
+            session: The session.
+            refresh_token: The refresh token.
+
+        Returns:
+            The access token and the refresh token.
+
+        Raises:
+            AuthCredentialsError: If the refresh token is invalid or the user is
+                inactive.
+
+        """
+        email, reused = await rotate_refresh_token(
+            digest=_token_key(token=refresh_token)
         )
 
+        if email is None:
+            raise AuthCredentialsError
+
+        if reused:
+            await revoke_refresh_tokens(email=email)
+            raise AuthCredentialsError
+
+        user = await self._get_cached_user(session=session, email=email)
+
+        if not user or not user.is_active:
+            raise AuthCredentialsError
+
+        return await self._issue_tokens(session=session, user=user)
+
+    async def logout(self, token: str, refresh_token: str | None = None) -> None:
+        """Logout a user.
+
+        Revokes the access token and consumes the refresh token, so any later use
+        of the refresh token is treated as reuse.
+
+        Args:
+            token: The access token.
+            refresh_token: The refresh token.
+
+        """
+        await self.revoke(token=token)
+
+        if refresh_token is not None:
+            await rotate_refresh_token(digest=_token_key(token=refresh_token))
+
     async def register(
         self,
         session: AsyncSession,
@@ -218,6 +731,8 @@ class AuthUsecase:
     ) -> User:
         """Register a user.
 
+        Emails are unique regardless of case.
+
         Args:
             session: The session.
             email: The email.
@@ -232,28 +747,36 @@ class AuthUsecase:
             UserAlreadyExistsError: If the user already exists.
 
         """
-        if await self._user_repository.get_by(session=session, email=email):
-            raise UserAlreadyExistsError
-
-        return await self._user_repository.create(
+        user = await self._user_repository.create_unique(
             session=session,
             data={
                 "email": email,
                 "first_name": first_name,
                 "last_name": last_name,
-                "hashed_password": pwd_context.hash(secret=password),
+                "hashed_password": await crypto.hash(secret=password),
                 "is_active": False,
                 "role": RoleEnum.USER,
             },
         )
 
-    async def send_email_code(self, session: AsyncSession, email: str) -> None:
+        if not user:
+            raise UserAlreadyExistsError
+
+        return user
+
+    async def send_email_code(self, session: AsyncSession, email: str) -> int:
         """Send an email code.
 
+        Repeated requests during the cooldown send nothing, and the code is reused
+        until it expires.
+
         Args:
             session: The session.
             email: The email.
 
+        Returns:
+            The seconds before the code can be sent again.
+
         Raises:
             UserAlreadyActiveError: If the user is already active.
 
@@ -263,8 +786,11 @@ class AuthUsecase:
         if user.is_active:
             raise UserAlreadyActiveError
 
-        code = self._generate_code()
-        await set_verify_code(identifier=user.email, code=code)
+        code, retry_after = await issue_verify_code(
+            identifier=user.email, code=self._generate_code()
+        )
+        if code is None:
+            return retry_after
 
         html_content = (
             "<html><body><p>Code, which should be copied and used for "
@@ -272,15 +798,19 @@ class AuthUsecase:
             "which does not check incoming mail</p></body></html>"
         ).format(code=code)
 
-        send_email(
+        await send_email(
             email=user.email,
             html_content=html_content,
             subject="Your verification code",
         )
 
+        return retry_after
+
     async def verify_email(self, email: str, code: str, session: AsyncSession) -> None:
         """Verify an email.
 
+        The code can be used once, and is deleted after too many failed attempts.
+
         Args:
             email: The email.
             code: The code.
@@ -296,11 +826,14 @@ class AuthUsecase:
         if user.is_active:
             raise UserAlreadyActiveError
 
-        if await get_verify_code(identifier=user.email) != code:
+        if not await consume_verify_code(identifier=user.email, code=code):
             raise AuthCodeInvalidError
 
-        await self._user_repository.update_by(
+        user = await self._user_repository.update_by(
             session=session,
             data={"is_active": True},
             id=user.id,
         )
+
+        if user:
+            await user_cache.set(user=user)
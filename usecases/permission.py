@@ -1,11 +1,23 @@
+import asyncio
 from typing import Any
 
+from loguru import logger
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from constants import ROLE_PERMISSIONS
 from db.models import Permission
 from db.repositories import PermissionRepository
 from db.sessions import async_session
+from utils.cache import PermissionMatrix
+from utils.redis import (
+    get_permission_version,
+    incr_permission_version,
+    publish_permission_update,
+    subscribe_permission_updates,
+)
+
+permission_matrix = PermissionMatrix()
 
 
 class PermissionUsecase:
@@ -43,6 +55,42 @@ class PermissionUsecase:
                 ],
             )
 
+    async def load_matrix(self) -> None:
+        """Load all permissions into the in-memory permission matrix."""
+        version = await get_permission_version()
+
+        async with async_session() as session:
+            permissions = await self._permission_repository.get_all(session=session)
+
+        permission_matrix.load(
+            grants={
+                (permission.role, permission.action, permission.resource): (
+                    permission.is_active
+                )
+                for permission in permissions
+            },
+            version=version,
+        )
+
+    async def watch_matrix(self, retry_delay: float = 1.0) -> None:
+        """Reload the permission matrix on every published permission update.
+
+        The matrix is reloaded after each (re)subscription, so updates published
+        while disconnected are not lost.
+
+        Args:
+            retry_delay: The delay before resubscribing after a redis error.
+
+        """
+        while True:
+            try:
+                async for version in subscribe_permission_updates():
+                    if version is None or version != permission_matrix.version:
+                        await self.load_matrix()
+            except RedisError as e:
+                logger.warning(f"Permission updates subscription failed: {e}")
+                await asyncio.sleep(retry_delay)
+
     async def get_permissions(
         self, session: AsyncSession, **filters
     ) -> list[Permission]:
@@ -63,6 +111,10 @@ class PermissionUsecase:
     ) -> Permission:
         """Update permission by filters.
 
+        Bumps the permission version, so tokens with embedded permissions are
+        checked against the database again, and notifies all workers to reload
+        their permission matrix.
+
         Args:
             session: The session.
             data: The data.
@@ -72,6 +124,10 @@ class PermissionUsecase:
             The permission.
 
         """
-        return await self._permission_repository.update_by(
+        permission = await self._permission_repository.update_by(
             session=session, data=data, **filters
         )
+
+        await publish_permission_update(version=await incr_permission_version())
+
+        return permission
@@ -1,15 +1,132 @@
-from typing import Any
+import asyncio
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Any, AsyncGenerator, Iterator
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import User
 from db.repositories import UserRepository
+from db.sessions import SessionFactory
+from settings import auth_settings
+from utils import crypto
+from utils.cache import UserCache
+from utils.redis import revoke_refresh_tokens
+
+user_cache = UserCache(
+    maxsize=auth_settings.user_cache_size, local_ttl=auth_settings.user_cache_local_ttl
+)
 
 
 class UserUsecase:
     def __init__(self):
         self._user_repository = UserRepository()
 
+    async def get_users(
+        self, session: AsyncSession, limit: int, cursor: int | None = None, **filters
+    ) -> tuple[list[User], int | None]:
+        """Get a page of users.
+
+        Args:
+            session: The session.
+            limit: The max number of users.
+            cursor: The cursor of the page, None for the first page.
+            **filters: The filters.
+
+        Returns:
+            The list of users, and the cursor of the next page if there is one.
+
+        """
+        users = await self._user_repository.get_page(
+            session=session, limit=limit + 1, after=cursor, **filters
+        )
+
+        if len(users) > limit:
+            return users[:limit], users[limit - 1].id
+
+        return users, None
+
+    async def export(
+        self, session_maker: SessionFactory, **filters
+    ) -> AsyncGenerator[str, None]:
+        """Export users as newline delimited JSON.
+
+        The users are streamed from the database in batches with their own session,
+        so the export can outlive the request handler with flat memory.
+
+        Args:
+            session_maker: The session factory.
+            **filters: The filters.
+
+        Yields:
+            The batches of JSON lines.
+
+        """
+        async with session_maker() as session:
+            async for users in self._user_repository.stream(session=session, **filters):
+                yield "".join(
+                    json.dumps(dict(user), default=datetime.isoformat) + "\n"
+                    for user in users
+                )
+
+    async def import_users(
+        self,
+        session: AsyncSession,
+        users: Iterator[dict[str, Any]],
+        chunk_size: int = 10000,
+    ) -> dict[str, int]:
+        """Import users, skipping emails that already exist.
+
+        Users are read in chunks off the event loop and plaintext passwords are
+        hashed in the import hashing processes. Only then is a chunk copied into a
+        staging table and merged into the users in one transaction, so no connection
+        is held while hashing. Chunks are committed one by one, an invalid user
+        stops the import after the chunks before it.
+
+        Args:
+            session: The session.
+            users: The users.
+            chunk_size: The number of users read, hashed and copied at once.
+
+        Returns:
+            The number of received and imported users.
+
+        """
+        received = imported = 0
+        while chunk := await asyncio.to_thread(lambda: list(islice(users, chunk_size))):
+            hashed_passwords = iter(
+                await crypto.hash_many(
+                    secrets=[
+                        user["password"]
+                        for user in chunk
+                        if user["password"] and not user["hashed_password"]
+                    ]
+                )
+            )
+            records = [
+                (
+                    user["email"],
+                    user["first_name"],
+                    user["last_name"],
+                    user["role"].name,
+                    user["is_active"],
+                    user["hashed_password"]
+                    or (next(hashed_passwords) if user["password"] else None),
+                )
+                for user in chunk
+            ]
+
+            await self._user_repository.create_import_table(session=session)
+            await self._user_repository.copy_to_import_table(
+                session=session, records=records
+            )
+            imported += await self._user_repository.merge_import_table(session=session)
+            await session.commit()
+            received += len(chunk)
+
+        return {"received": received, "imported": imported}
+
     async def update_by(
         self, session: AsyncSession, data: dict[str, Any], id: int
     ) -> User:
@@ -24,16 +141,25 @@ class UserUsecase:
             The user.
 
         """
-        return await self._user_repository.update_by(session=session, data=data, id=id)
+        user = await self._user_repository.update_by(session=session, data=data, id=id)
+
+        if user:
+            await user_cache.set(user=user)
+
+        return user
 
     async def delete_by(self, session: AsyncSession, id: int) -> None:
-        """Delete a user by id.
+        """Delete a user by id and revoke its refresh tokens.
 
         Args:
             session: The session.
             id: The id.
 
         """
-        await self._user_repository.update_by(
+        user = await self._user_repository.update_by(
             session=session, data={"is_active": False}, id=id
         )
+
+        if user:
+            await user_cache.set(user=user)
+            await revoke_refresh_tokens(email=user.email)
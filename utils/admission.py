@@ -0,0 +1,71 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+
+from exceptions import ServiceOverloadedError
+from settings import crypto_settings
+
+
+class AdmissionController:
+    def __init__(self, limit: int, queue_size: int, retry_after: int):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+
+        self._semaphore = asyncio.Semaphore(value=limit)
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncGenerator[None, None]:
+        """Hold a slot for the duration of the block.
+
+        Waits in the queue when all slots are taken.
+
+        Raises:
+            ServiceOverloadedError: If the queue is full.
+
+        """
+        if self._semaphore.locked() and self.queued >= self.queue_size:
+            self.rejected += 1
+            raise ServiceOverloadedError(retry_after=self.retry_after)
+
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        self.active += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict[str, int]:
+        """Get the admission counters.
+
+        Returns:
+            The admission counters.
+
+        """
+        return {
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "active": self.active,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+hash_admission = AdmissionController(
+    limit=crypto_settings.max_concurrent_hashes,
+    queue_size=crypto_settings.max_queued_hashes,
+    retry_after=crypto_settings.retry_after,
+)
@@ -0,0 +1,300 @@
+import hashlib
+import json
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Generic, TypeVar
+
+from db.models import User
+from utils.redis import get_cached_user, set_cached_user
+
+Value = TypeVar("Value")
+
+
+class LRUCache(Generic[Value]):
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[str, tuple[float, Value]] = OrderedDict()
+
+    def get(self, key: str) -> Value | None:
+        """Get a value that has not expired yet.
+
+        Args:
+            key: The key.
+
+        Returns:
+            The value.
+
+        """
+        entry = self._entries.get(key)
+
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        return entry[1]
+
+    def set(self, key: str, value: Value, expires_at: float) -> None:
+        """Set a value, evicting the least recently used one when full.
+
+        Args:
+            key: The key.
+            value: The value.
+            expires_at: The unix timestamp the value expires at.
+
+        """
+        if self.maxsize <= 0:
+            return
+
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Delete a value.
+
+        Args:
+            key: The key.
+
+        """
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Delete all values."""
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Get the cache counters.
+
+        Returns:
+            The cache counters.
+
+        """
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class PermissionMatrix:
+    def __init__(self):
+        self.version: int | None = None
+
+        self._grants: dict[tuple[str, str, str], bool] = {}
+
+    def load(self, grants: dict[tuple[str, str, str], bool], version: int) -> None:
+        """Replace the grants.
+
+        Args:
+            grants: The activity of permissions by role, action and resource.
+            version: The version of the permissions.
+
+        """
+        self._grants = grants
+        self.version = version
+
+    def is_allowed(self, role: str, action: str, resource: str) -> bool | None:
+        """Check if a role is allowed to call the action on the resource.
+
+        Args:
+            role: The role.
+            action: The action.
+            resource: The resource.
+
+        Returns:
+            Whether the role is allowed, None if the grants are not loaded.
+
+        """
+        if self.version is None:
+            return None
+
+        return self._grants.get((role, action, resource), False)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / max(capacity, 1) * math.log(2)))
+        self.count = 0
+        self.checks = 0
+        self.positives = 0
+
+        self._bits = bytearray(math.ceil(self.size / 8))
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], byteorder="big")
+        second = int.from_bytes(digest[8:], byteorder="big") | 1
+
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        """Add a key.
+
+        Args:
+            key: The key.
+
+        """
+        for position in self._positions(key=key):
+            self._bits[position // 8] |= 1 << position % 8
+
+        self.count += 1
+
+    def might_contain(self, key: str) -> bool:
+        """Check if a key may have been added.
+
+        Args:
+            key: The key.
+
+        Returns:
+            False if the key was never added, True if it probably was.
+
+        """
+        self.checks += 1
+
+        if all(
+            self._bits[position // 8] & 1 << position % 8
+            for position in self._positions(key=key)
+        ):
+            self.positives += 1
+            return True
+
+        return False
+
+    def load(self, keys: list[str]) -> None:
+        """Replace all keys.
+
+        Args:
+            keys: The keys.
+
+        """
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
+
+        for key in keys:
+            self.add(key=key)
+
+    def stats(self) -> dict[str, int]:
+        """Get the filter counters.
+
+        Returns:
+            The filter counters.
+
+        """
+        return {
+            "size": self.size,
+            "hashes": self.hashes,
+            "count": self.count,
+            "capacity": self.capacity,
+            "checks": self.checks,
+            "positives": self.positives,
+        }
+
+
+class UserCache:
+    _fields = (
+        "id",
+        "first_name",
+        "last_name",
+        "email",
+        "role",
+        "is_active",
+        "last_login",
+        "created_at",
+        "updated_at",
+    )
+    _datetime_fields = ("last_login", "created_at", "updated_at")
+
+    def __init__(self, maxsize: int, local_ttl: int):
+        self.local_ttl = local_ttl
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+        self._local: LRUCache[str] = LRUCache(maxsize=maxsize)
+
+    def _dump(self, user: User) -> str:
+        return json.dumps(
+            {field: getattr(user, field) for field in self._fields},
+            default=datetime.isoformat,
+        )
+
+    def _load(self, data: str) -> User:
+        values = json.loads(data)
+        for field in self._datetime_fields:
+            if values[field] is not None:
+                values[field] = datetime.fromisoformat(values[field])
+
+        return User(**values)
+
+    async def get(self, email: str) -> User | None:
+        """Get a user from the worker cache, then from redis.
+
+        The hashed password is never cached, the returned user is transient.
+
+        Args:
+            email: The email.
+
+        Returns:
+            The user.
+
+        """
+        data = self._local.get(key=email)
+        if data is not None:
+            self.local_hits += 1
+            return self._load(data=data)
+
+        data = await get_cached_user(email=email)
+        if data is None:
+            self.misses += 1
+            return None
+
+        self.shared_hits += 1
+        self._local.set(key=email, value=data, expires_at=time.time() + self.local_ttl)
+
+        return self._load(data=data)
+
+    async def set(self, user: User) -> None:
+        """Set a user to redis and the worker cache.
+
+        Args:
+            user: The user.
+
+        """
+        data = self._dump(user=user)
+
+        await set_cached_user(email=user.email, user=data)
+        self._local.set(
+            key=user.email, value=data, expires_at=time.time() + self.local_ttl
+        )
+
+    def stats(self) -> dict[str, int]:
+        """Get the cache counters.
+
+        Returns:
+            The cache counters.
+
+        """
+        return {
+            "size": self._local.stats()["size"],
+            "maxsize": self._local.maxsize,
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+        }
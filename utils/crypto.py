@@ -1,3 +1,226 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from loguru import logger
 from passlib.context import CryptContext
+from redis.exceptions import RedisError
+
+from settings import crypto_settings
+from utils.redis import get_password_cost, set_password_cost
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+_executor: ProcessPoolExecutor | None = None
+_import_executor: ProcessPoolExecutor | None = None
+
+_COST_RANGE = {"bcrypt": (4, 20), "argon2": (1, 32)}
+
+
+def _scheme_options(cost: int) -> dict[str, Any]:
+    # passlib exposes the bcrypt work factor and the argon2 time cost as rounds
+    scheme = crypto_settings.scheme
+    options = {f"{scheme}__rounds": cost, f"{scheme}__min_rounds": cost}
+    if scheme == "argon2":
+        options["argon2__memory_cost"] = crypto_settings.argon2_memory_cost
+
+    return options
+
+
+def _measure(cost: int) -> float:
+    context = CryptContext(
+        schemes=[crypto_settings.scheme],
+        **_scheme_options(cost=cost),
+    )
+
+    started = time.perf_counter()
+    context.hash(secret="calibration")  # noqa: S106
+    return time.perf_counter() - started
+
+
+def measure_cost() -> int:
+    """Measure the highest cost of the configured scheme within the target time.
+
+    Returns:
+        The cost.
+
+    """
+    min_cost, max_cost = _COST_RANGE[crypto_settings.scheme]
+
+    cost = min_cost
+    while cost < max_cost and _measure(cost=cost + 1) <= (
+        crypto_settings.target_hash_time
+    ):
+        cost += 1
+
+    return cost
+
+
+async def calibrate() -> dict:
+    """Configure the password context with the cost shared by the workers.
+
+    The cost is the fixed cost if configured, otherwise the one calibrated at
+    deploy time and shared in redis. If none was calibrated yet, it is measured
+    here and shared, unless another worker shared one first, so all workers hash
+    with the same cost. Hashes with another scheme or a lower cost are reported
+    by `needs_update`.
+
+    Returns:
+        The applied password context policy.
+
+    """
+    scheme = crypto_settings.scheme
+
+    cost = crypto_settings.cost
+    if cost is None:
+        try:
+            cost = await get_password_cost(scheme=scheme)
+            if cost is None:
+                cost = await set_password_cost(
+                    scheme=scheme,
+                    cost=await asyncio.to_thread(measure_cost),
+                    replace=False,
+                )
+        except RedisError as e:
+            logger.warning(f"Shared password cost unavailable, measuring: {e}")
+            cost = await asyncio.to_thread(measure_cost)
+
+    pwd_context.update(
+        schemes=list(dict.fromkeys([scheme, "bcrypt"])),
+        default=scheme,
+        **_scheme_options(cost=cost),
+    )
+
+    return pwd_context.to_dict()
+
+
+def _configure(policy: dict) -> None:
+    pwd_context.load(policy)
+
+
+def _hash(secret: str) -> str:
+    return pwd_context.hash(secret=secret)
+
+
+def _hash_many(secrets: list[str]) -> list[str]:
+    return [pwd_context.hash(secret=secret) for secret in secrets]
+
+
+def _verify(secret: str, hash: str) -> bool:
+    return pwd_context.verify(secret=secret, hash=hash)
+
+
+def _create_executor(max_workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_configure,
+        initargs=(pwd_context.to_dict(),),
+    )
+
+
+def _get_import_executor() -> ProcessPoolExecutor:
+    global _import_executor  # noqa: PLW0603
+
+    if _import_executor is None:
+        _import_executor = _create_executor(max_workers=crypto_settings.import_workers)
+
+    return _import_executor
+
+
+def start_executor() -> None:
+    """Start the password hashing process pool.
+
+    Until it is started, hashing falls back to the default thread pool of the
+    running loop, so the event loop is never blocked by bcrypt.
+
+    """
+    global _executor  # noqa: PLW0603
+
+    if _executor is None:
+        _executor = _create_executor(max_workers=crypto_settings.workers)
+
+
+def shutdown_executor() -> None:
+    """Shutdown the password hashing process pools."""
+    global _executor, _import_executor  # noqa: PLW0603
+
+    for executor in (_executor, _import_executor):
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    _executor = None
+    _import_executor = None
+
+
+def needs_update(hash: str) -> bool:
+    """Check if a hash was made with an outdated scheme or cost.
+
+    Args:
+        hash: The hashed password.
+
+    Returns:
+        True if the password should be rehashed, False otherwise.
+
+    """
+    return pwd_context.needs_update(hash=hash)
+
+
+async def hash(secret: str) -> str:
+    """Hash a password outside of the event loop.
+
+    Args:
+        secret: The password.
+
+    Returns:
+        The hashed password.
+
+    """
+    return await asyncio.get_running_loop().run_in_executor(_executor, _hash, secret)
+
+
+async def verify(secret: str, hash: str) -> bool:
+    """Verify a password against a hash outside of the event loop.
+
+    Args:
+        secret: The password.
+        hash: The hashed password.
+
+    Returns:
+        True if the password matches the hash, False otherwise.
+
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor, _verify, secret, hash
+    )
+
+
+async def hash_many(secrets: list[str], chunk_size: int = 100) -> list[str]:
+    """Hash passwords in chunks spread over the import hashing processes.
+
+    Imports get their own process pool, started on first use, so a bulk of
+    hashes never queues in front of the hashes of logins and registrations.
+
+    Args:
+        secrets: The passwords.
+        chunk_size: The number of passwords hashed per task.
+
+    Returns:
+        The hashed passwords, in the order of the passwords.
+
+    """
+    if not secrets:
+        return []
+
+    loop = asyncio.get_running_loop()
+    executor = _get_import_executor()
+    chunks = await asyncio.gather(
+        *(
+            loop.run_in_executor(executor, _hash_many, secrets[i : i + chunk_size])
+            for i in range(0, len(secrets), chunk_size)
+        )
+    )
+
+    return [hashed for chunk in chunks for hashed in chunk]
@@ -3,10 +3,11 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 from settings.smtp import smtp_settings
+from utils.redis import enqueue_email
 
 
-def send_email(email: str, html_content: str, subject: str) -> None:
-    """Send email to user
+async def send_email(email: str, html_content: str, subject: str) -> None:
+    """Queue email to user, it is sent by the email worker.
 
     Args:
         email: Email address to send the email to.
@@ -14,20 +15,58 @@ def send_email(email: str, html_content: str, subject: str) -> None:
         subject: Subject of the email.
 
     """
-    message = MIMEMultipart()
-    message["Subject"] = subject
-    message["From"] = smtp_settings.username
-    message["To"] = email
-    message.attach(payload=MIMEText(html_content, "html"))
+    await enqueue_email(email=email, subject=subject, html_content=html_content)
 
-    smtp_class = smtplib.SMTP_SSL if smtp_settings.ssl else smtplib.SMTP
 
-    with smtp_class(host=smtp_settings.host, port=smtp_settings.port) as server:
+class SMTPMailer:
+    def __init__(self):
+        self._server: smtplib.SMTP | None = None
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp_class = smtplib.SMTP_SSL if smtp_settings.ssl else smtplib.SMTP
+
+        server = smtp_class(
+            host=smtp_settings.host,
+            port=smtp_settings.port,
+            timeout=smtp_settings.timeout,
+        )
         if smtp_settings.ssl:
             server.login(user=smtp_settings.username, password=smtp_settings.password)
 
-        server.sendmail(
+        return server
+
+    def send(self, email: str, html_content: str, subject: str) -> None:
+        """Send email to user over the open connection, opening it if needed.
+
+        Args:
+            email: Email address to send the email to.
+            html_content: HTML content of the email.
+            subject: Subject of the email.
+
+        """
+        message = MIMEMultipart()
+        message["Subject"] = subject
+        message["From"] = smtp_settings.username
+        message["To"] = email
+        message.attach(payload=MIMEText(html_content, "html"))
+
+        if self._server is None:
+            self._server = self._connect()
+
+        self._server.sendmail(
             from_addr=smtp_settings.username,
             to_addrs=email,
             msg=message.as_string(),
         )
+
+    def close(self) -> None:
+        """Close the connection."""
+        if self._server is None:
+            return
+
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            self._server.close()
+        finally:
+            self._server = None
@@ -0,0 +1,83 @@
+import csv
+import json
+from typing import Any, Iterator, Literal, TextIO
+
+from pydantic import EmailStr, TypeAdapter, ValidationError
+
+from enums import RoleEnum
+from exceptions import UserImportInvalidError
+from utils.crypto import pwd_context
+
+email_adapter = TypeAdapter(EmailStr)
+
+
+def _parse_user(values: Any, line: int) -> dict[str, Any]:
+    if not isinstance(values, dict):
+        raise UserImportInvalidError(line=line)
+
+    try:
+        email = email_adapter.validate_python((values.get("email") or "").strip())
+    except ValidationError as e:
+        raise UserImportInvalidError(line=line) from e
+
+    hashed_password = values.get("hashed_password") or None
+    if hashed_password and pwd_context.identify(hash=hashed_password) is None:
+        raise UserImportInvalidError(line=line)
+
+    try:
+        role = RoleEnum(values.get("role") or RoleEnum.USER)
+    except ValueError as e:
+        raise UserImportInvalidError(line=line) from e
+
+    is_active = values.get("is_active")
+    if is_active is None or is_active == "":
+        is_active = True
+    elif isinstance(is_active, str):
+        is_active = is_active.strip().lower() in {"1", "true", "yes"}
+
+    return {
+        "email": email,
+        "first_name": values.get("first_name") or None,
+        "last_name": values.get("last_name") or None,
+        "role": role,
+        "is_active": bool(is_active),
+        "password": values.get("password") or None,
+        "hashed_password": hashed_password,
+    }
+
+
+def read_users(
+    file: TextIO, file_format: Literal["csv", "ndjson"]
+) -> Iterator[dict[str, Any]]:
+    """Read users to import from a CSV file with a header, or an NDJSON file.
+
+    Every user has a valid email and optionally a first_name, last_name, role,
+    is_active, and either a plaintext password or a hashed_password of a known
+    scheme.
+
+    Args:
+        file: The file.
+        file_format: The format of the file.
+
+    Yields:
+        The users.
+
+    Raises:
+        UserImportInvalidError: If a user is invalid.
+
+    """
+    if file_format == "csv":
+        for line, values in enumerate(csv.DictReader(file), start=2):
+            yield _parse_user(values=values, line=line)
+        return
+
+    for line, text in enumerate(file, start=1):
+        if not text.strip():
+            continue
+
+        try:
+            values = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise UserImportInvalidError(line=line) from e
+
+        yield _parse_user(values=values, line=line)
@@ -1,4 +1,9 @@
+import math
+import time
+from typing import AsyncGenerator
+
 import redis.asyncio as redis
+from redis.exceptions import ResponseError
 
 from settings import auth_settings, redis_settings
 
@@ -9,28 +14,550 @@ redis_client = redis.StrictRedis(
     decode_responses=True,
 )
 
+PERMISSION_VERSION_KEY = "permission:version"
+PERMISSION_CHANNEL = "permission:updates"
+USER_KEY = "user:{email}"
+REFRESH_KEY = "refresh:{digest}"
+USED_REFRESH_KEY = "refresh:used:{digest}"
+USER_REFRESHES_KEY = "refresh:user:{email}"
+REVOKED_KEY = "revoked:{jti}"
+REVOKED_STREAM = "revoked"
+RATE_LIMIT_KEY = "rate:{scope}:{subject}"
+VERIFY_COOLDOWN_KEY = "{identifier}:cooldown"
+VERIFY_ATTEMPTS_KEY = "{identifier}:attempts"
+HASH_COST_KEY = "crypto:cost:{scheme}"
+EMAIL_STREAM = "email:outbox"
+EMAIL_DEAD_STREAM = "email:dead"
+EMAIL_GROUP = "email-workers"
+
+# Consumes a refresh token: the owner and 0 if it was valid, the owner and 1 if it
+# was already used, nothing if it is unknown. Used tokens are remembered to detect
+# reuse.
+ROTATE_REFRESH_SCRIPT = redis_client.register_script(script="""
+    local email = redis.call('GETDEL', KEYS[1])
+    if email then
+        redis.call('SET', KEYS[2], email, 'EX', ARGV[1])
+        redis.call('SREM', ARGV[2] .. email, ARGV[3])
+        return {email, 0}
+    end
+    local reused = redis.call('GET', KEYS[2])
+    if reused then
+        return {reused, 1}
+    end
+    return {}
+    """)
+
+REVOKE_REFRESHES_SCRIPT = redis_client.register_script(script="""
+    local digests = redis.call('SMEMBERS', KEYS[1])
+    for _, digest in ipairs(digests) do
+        redis.call('DEL', ARGV[1] .. digest)
+    end
+    redis.call('DEL', KEYS[1])
+    return #digests
+    """)
+
+# Counts a hit on every key unless one of them is over its limit, using a sliding
+# window approximated by the weighted counts of the previous and current windows.
+# Returns 0 if allowed, otherwise the seconds until the current window ends.
+SLIDING_WINDOW_SCRIPT = redis_client.register_script(script="""
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+    local window = tonumber(ARGV[1]) * 1000
+    local bucket = math.floor(now / window)
+    local elapsed = now - bucket * window
+    local weight = 1 - elapsed / window
+    for i, key in ipairs(KEYS) do
+        local previous = tonumber(redis.call('GET', key .. ':' .. (bucket - 1)) or 0)
+        local current = tonumber(redis.call('GET', key .. ':' .. bucket) or 0)
+        if previous * weight + current >= tonumber(ARGV[i + 1]) then
+            return math.max(1, math.ceil((window - elapsed) / 1000))
+        end
+    end
+    for _, key in ipairs(KEYS) do
+        redis.call('INCR', key .. ':' .. bucket)
+        redis.call('PEXPIRE', key .. ':' .. bucket, window * 2)
+    end
+    return 0
+    """)
+
+# Returns nothing and the remaining cooldown in milliseconds while it lasts.
+# Otherwise stores the new code unless one is still valid, renews the ttl of the
+# code and its failed attempts, starts the cooldown and returns the code with the
+# cooldown.
+ISSUE_VERIFY_CODE_SCRIPT = redis_client.register_script(script="""
+    local cooldown = redis.call('PTTL', KEYS[2])
+    if cooldown > 0 then
+        return {false, cooldown}
+    end
+    local code = redis.call('GET', KEYS[1])
+    if code then
+        redis.call('EXPIRE', KEYS[3], ARGV[2])
+    else
+        code = ARGV[1]
+        redis.call('DEL', KEYS[3])
+    end
+    redis.call('SET', KEYS[1], code, 'EX', ARGV[2])
+    if tonumber(ARGV[3]) > 0 then
+        redis.call('SET', KEYS[2], 1, 'PX', ARGV[3])
+    end
+    return {code, tonumber(ARGV[3])}
+    """)
+
 
-async def set_verify_code(identifier: str, code: str) -> None:
-    """Set the code to the redis client.
+async def issue_verify_code(identifier: str, code: str) -> tuple[str | None, int]:
+    """Set the code to the redis client, unless a code was issued recently.
+
+    An unexpired code is reused instead of the new one.
 
     Args:
         identifier: The identifier.
-        code: The code.
+        code: The new code.
+
+    Returns:
+        The code to send, None if it was already sent during the cooldown, and the
+        remaining cooldown in seconds.
 
     """
-    await redis_client.setex(
-        name=identifier, time=auth_settings.verify_code_ttl, value=code
+    issued_code, cooldown = await ISSUE_VERIFY_CODE_SCRIPT(
+        keys=[
+            identifier,
+            VERIFY_COOLDOWN_KEY.format(identifier=identifier),
+            VERIFY_ATTEMPTS_KEY.format(identifier=identifier),
+        ],
+        args=[
+            code,
+            auth_settings.verify_code_ttl,
+            auth_settings.verify_code_cooldown * 1000,
+        ],
+        client=redis_client,
     )
 
+    return issued_code, math.ceil(int(cooldown) / 1000)
+
 
-async def get_verify_code(identifier: str) -> str | None:
-    """Get the code from the redis client.
+# Deletes the code and its failed attempts and returns 1 if the code matches.
+# Otherwise counts a failed attempt, deletes the code after too many of them and
+# returns 0.
+CONSUME_VERIFY_CODE_SCRIPT = redis_client.register_script(script="""
+    local code = redis.call('GET', KEYS[1])
+    if not code then
+        return 0
+    end
+    if code == ARGV[1] then
+        redis.call('DEL', KEYS[1], KEYS[2])
+        return 1
+    end
+    local attempts = redis.call('INCR', KEYS[2])
+    if attempts >= tonumber(ARGV[2]) then
+        redis.call('DEL', KEYS[1], KEYS[2])
+    else
+        redis.call('PEXPIRE', KEYS[2], redis.call('PTTL', KEYS[1]))
+    end
+    return 0
+    """)
+
+
+async def consume_verify_code(identifier: str, code: str) -> bool:
+    """Check the code and delete it from the redis client if it matches.
+
+    The code is also deleted after too many failed attempts.
 
     Args:
         identifier: The identifier.
+        code: The code to check.
+
+    Returns:
+        True if the code matches, False otherwise.
+
+    """
+    return bool(
+        await CONSUME_VERIFY_CODE_SCRIPT(
+            keys=[identifier, VERIFY_ATTEMPTS_KEY.format(identifier=identifier)],
+            args=[code, auth_settings.verify_code_max_attempts],
+            client=redis_client,
+        )
+    )
+
+
+async def get_permission_version() -> int:
+    """Get the version of the permissions.
+
+    Returns:
+        The version.
+
+    """
+    return int(await redis_client.get(name=PERMISSION_VERSION_KEY) or 0)
+
+
+async def get_password_cost(scheme: str) -> int | None:
+    """Get the password hashing cost shared by the workers.
+
+    Args:
+        scheme: The password hashing scheme.
+
+    Returns:
+        The cost, None if it was not calibrated.
+
+    """
+    cost = await redis_client.get(name=HASH_COST_KEY.format(scheme=scheme))
+    return int(cost) if cost is not None else None
+
+
+async def set_password_cost(scheme: str, cost: int, replace: bool = True) -> int:
+    """Set the password hashing cost shared by the workers.
+
+    Args:
+        scheme: The password hashing scheme.
+        cost: The cost.
+        replace: Whether to replace a cost that is already set.
+
+    Returns:
+        The shared cost, the one already set if it is not replaced.
+
+    """
+    key = HASH_COST_KEY.format(scheme=scheme)
+    async with redis_client.pipeline(transaction=True) as pipeline:
+        pipeline.set(name=key, value=cost, nx=not replace)
+        pipeline.get(name=key)
+        _, shared_cost = await pipeline.execute()
+
+    return int(shared_cost)
+
+
+async def incr_permission_version() -> int:
+    """Increment the version of the permissions.
+
+    Returns:
+        The new version.
+
+    """
+    return await redis_client.incr(name=PERMISSION_VERSION_KEY)
+
+
+async def publish_permission_update(version: int) -> None:
+    """Notify all workers that the permissions were updated.
+
+    Args:
+        version: The new version of the permissions.
+
+    """
+    await redis_client.publish(channel=PERMISSION_CHANNEL, message=version)
+
+
+async def subscribe_permission_updates() -> AsyncGenerator[int | None, None]:
+    """Listen to permission updates.
+
+    Yields:
+        None once subscribed, then the version of each update.
+
+    """
+    async with redis_client.pubsub() as pubsub:
+        await pubsub.subscribe(PERMISSION_CHANNEL)
+
+        async for message in pubsub.listen():
+            if message["type"] == "subscribe":
+                yield None
+            elif message["type"] == "message":
+                yield int(message["data"])
+
+
+async def get_cached_user(email: str) -> str | None:
+    """Get the serialized user from the redis client.
+
+    Args:
+        email: The email.
+
+    Returns:
+        The serialized user.
+
+    """
+    return await redis_client.get(name=USER_KEY.format(email=email))
+
+
+async def set_cached_user(email: str, user: str) -> None:
+    """Set the serialized user to the redis client.
+
+    Args:
+        email: The email.
+        user: The serialized user.
+
+    """
+    await redis_client.setex(
+        name=USER_KEY.format(email=email), time=auth_settings.user_cache_ttl, value=user
+    )
+
+
+async def set_refresh_token(digest: str, email: str) -> None:
+    """Set the refresh token of the user to the redis client.
+
+    Args:
+        digest: The digest of the refresh token.
+        email: The email.
+
+    """
+    ttl = auth_settings.refresh_token_expire_days * 24 * 60 * 60
+    user_refreshes_key = USER_REFRESHES_KEY.format(email=email)
+
+    async with redis_client.pipeline(transaction=True) as pipeline:
+        pipeline.setex(name=REFRESH_KEY.format(digest=digest), time=ttl, value=email)
+        pipeline.sadd(user_refreshes_key, digest)
+        pipeline.expire(name=user_refreshes_key, time=ttl)
+        await pipeline.execute()
+
+
+async def rotate_refresh_token(digest: str) -> tuple[str | None, bool]:
+    """Consume the refresh token and remember it as used.
+
+    Args:
+        digest: The digest of the refresh token.
+
+    Returns:
+        The email of the token owner, and whether the token was already used.
+
+    """
+    result = await ROTATE_REFRESH_SCRIPT(
+        keys=[
+            REFRESH_KEY.format(digest=digest),
+            USED_REFRESH_KEY.format(digest=digest),
+        ],
+        args=[
+            auth_settings.refresh_token_expire_days * 24 * 60 * 60,
+            USER_REFRESHES_KEY.format(email=""),
+            digest,
+        ],
+        client=redis_client,
+    )
+
+    if not result:
+        return None, False
+
+    email, reused = result
+    return email, bool(reused)
+
+
+async def revoke_refresh_tokens(email: str) -> int:
+    """Delete all refresh tokens of the user.
+
+    Args:
+        email: The email.
+
+    Returns:
+        The number of revoked refresh tokens.
+
+    """
+    return int(
+        await REVOKE_REFRESHES_SCRIPT(
+            keys=[USER_REFRESHES_KEY.format(email=email)],
+            args=[REFRESH_KEY.format(digest="")],
+            client=redis_client,
+        )
+    )
+
+
+async def revoke_token_id(jti: str, ttl: int) -> None:
+    """Set the token id as revoked and append it to the revocation stream.
+
+    The stream is trimmed to the revocations of tokens that may not be expired.
+
+    Args:
+        jti: The token id.
+        ttl: The remaining lifetime of the token in seconds.
+
+    """
+    min_id = int(time.time() - auth_settings.access_token_expire_minutes * 60) * 1000
+
+    async with redis_client.pipeline(transaction=True) as pipeline:
+        pipeline.setex(name=REVOKED_KEY.format(jti=jti), time=max(ttl, 1), value=1)
+        pipeline.xadd(
+            name=REVOKED_STREAM,
+            fields={"jti": jti},
+            minid=max(min_id, 0),
+            approximate=True,
+        )
+        await pipeline.execute()
+
+
+async def is_token_id_revoked(jti: str) -> bool:
+    """Check if the token id is revoked.
+
+    Args:
+        jti: The token id.
+
+    Returns:
+        True if the token id is revoked, False otherwise.
+
+    """
+    return bool(await redis_client.exists(REVOKED_KEY.format(jti=jti)))
+
+
+async def read_revoked_token_ids(
+    last_id: str, block: int | None = None
+) -> tuple[str, list[str]]:
+    """Read the token ids revoked after the last read one.
+
+    Args:
+        last_id: The stream id of the last read revocation, "0" to read all.
+        block: The milliseconds to wait for new revocations.
+
+    Returns:
+        The stream id of the last revocation, and the revoked token ids.
+
+    """
+    token_ids = []
+
+    for _, entries in await redis_client.xread(
+        streams={REVOKED_STREAM: last_id}, block=block
+    ):
+        for entry_id, fields in entries:
+            last_id = entry_id
+            token_ids.append(fields["jti"])
+
+    return last_id, token_ids
+
+
+async def hit_rate_limits(limits: dict[str, int], window: int) -> int:
+    """Count a hit against every rate limit, unless one of them is exceeded.
+
+    Args:
+        limits: The max hits per window by rate limit key.
+        window: The sliding window in seconds.
+
+    Returns:
+        0 if the hit is allowed, otherwise the seconds to retry after.
+
+    """
+    return int(
+        await SLIDING_WINDOW_SCRIPT(
+            keys=list(limits),
+            args=[window, *limits.values()],
+            client=redis_client,
+        )
+    )
+
+
+async def enqueue_email(email: str, subject: str, html_content: str) -> str:
+    """Append an email to the outbox stream.
+
+    Args:
+        email: The email address to send the email to.
+        subject: The subject of the email.
+        html_content: The HTML content of the email.
+
+    Returns:
+        The stream id of the email.
+
+    """
+    return await redis_client.xadd(
+        name=EMAIL_STREAM,
+        fields={"email": email, "subject": subject, "html_content": html_content},
+    )
+
+
+async def create_email_group() -> None:
+    """Create the consumer group of the outbox stream if it does not exist."""
+    try:
+        await redis_client.xgroup_create(
+            name=EMAIL_STREAM, groupname=EMAIL_GROUP, id="0", mkstream=True
+        )
+    except ResponseError as e:
+        if not str(e).startswith("BUSYGROUP"):
+            raise
+
+
+async def read_emails(
+    consumer: str, count: int, block: int | None = None
+) -> list[tuple[str, dict[str, str]]]:
+    """Read new emails of the outbox stream for the consumer.
+
+    Args:
+        consumer: The consumer name.
+        count: The max number of emails.
+        block: The milliseconds to wait for new emails.
+
+    Returns:
+        The stream ids and fields of the emails.
+
+    """
+    return [
+        (message_id, fields)
+        for _, messages in await redis_client.xreadgroup(
+            groupname=EMAIL_GROUP,
+            consumername=consumer,
+            streams={EMAIL_STREAM: ">"},
+            count=count,
+            block=block,
+        )
+        for message_id, fields in messages
+    ]
+
+
+async def claim_stale_emails(
+    consumer: str, count: int, min_idle_time: int
+) -> list[tuple[str, dict[str, str], int]]:
+    """Claim emails read but not acknowledged by a consumer for too long.
+
+    Args:
+        consumer: The consumer name.
+        count: The max number of emails.
+        min_idle_time: The milliseconds since the emails were read.
 
     Returns:
-        The code.
+        The stream ids, fields and number of deliveries, this one included, of the
+        emails.
+
+    """
+    _, messages, *_ = await redis_client.xautoclaim(
+        name=EMAIL_STREAM,
+        groupname=EMAIL_GROUP,
+        consumername=consumer,
+        min_idle_time=min_idle_time,
+        count=count,
+    )
+    messages = [(message_id, fields) for message_id, fields in messages if fields]
+
+    async with redis_client.pipeline(transaction=False) as pipeline:
+        for message_id, _ in messages:
+            pipeline.xpending_range(
+                name=EMAIL_STREAM,
+                groupname=EMAIL_GROUP,
+                min=message_id,
+                max=message_id,
+                count=1,
+            )
+        pending = await pipeline.execute()
+
+    return [
+        (message_id, fields, entries[0]["times_delivered"] if entries else 1)
+        for (message_id, fields), entries in zip(messages, pending, strict=True)
+    ]
+
+
+async def ack_email(message_id: str) -> None:
+    """Acknowledge and delete a delivered email.
+
+    Args:
+        message_id: The stream id of the email.
+
+    """
+    async with redis_client.pipeline(transaction=True) as pipeline:
+        pipeline.xack(EMAIL_STREAM, EMAIL_GROUP, message_id)
+        pipeline.xdel(EMAIL_STREAM, message_id)
+        await pipeline.execute()
+
+
+async def dead_letter_email(
+    message_id: str, fields: dict[str, str], error: str
+) -> None:
+    """Move an undeliverable email to the dead letter stream.
+
+    Args:
+        message_id: The stream id of the email.
+        fields: The fields of the email.
+        error: The last delivery error.
 
     """
-    return await redis_client.get(name=identifier)
+    async with redis_client.pipeline(transaction=True) as pipeline:
+        pipeline.xadd(name=EMAIL_DEAD_STREAM, fields={**fields, "error": error})
+        pipeline.xack(EMAIL_STREAM, EMAIL_GROUP, message_id)
+        pipeline.xdel(EMAIL_STREAM, message_id)
+        await pipeline.execute()
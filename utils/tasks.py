@@ -0,0 +1,35 @@
+import asyncio
+from typing import Any, Coroutine
+
+from loguru import logger
+
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _on_done(task: asyncio.Task) -> None:
+    _background_tasks.discard(task)
+
+    if not task.cancelled() and (exception := task.exception()) is not None:
+        logger.opt(exception=exception).error(
+            f"Background task {task.get_name()} failed"
+        )
+
+
+def spawn(coroutine: Coroutine[Any, Any, Any], name: str | None = None) -> asyncio.Task:
+    """Run a coroutine in the background of the running loop.
+
+    Keeps a reference to the task until it is done and logs its failure.
+
+    Args:
+        coroutine: The coroutine.
+        name: The task name.
+
+    Returns:
+        The task.
+
+    """
+    task = asyncio.create_task(coroutine, name=name)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_done)
+
+    return task
@@ -0,0 +1,122 @@
+"""Deliver the emails of the outbox stream.
+
+python -m workers.email
+
+"""
+
+import asyncio
+import smtplib
+import socket
+
+from loguru import logger
+from redis.exceptions import RedisError
+
+from settings import smtp_settings
+from utils.email import SMTPMailer
+from utils.redis import (
+    ack_email,
+    claim_stale_emails,
+    create_email_group,
+    dead_letter_email,
+    read_emails,
+)
+
+
+class EmailWorker:
+    def __init__(self, consumer: str):
+        self.consumer = consumer
+
+        self._mailer = SMTPMailer()
+
+    async def _deliver(
+        self, message_id: str, fields: dict[str, str], deliveries: int
+    ) -> None:
+        """Send an email, or leave it pending to be retried, or dead letter it.
+
+        A failed email stays pending and is claimed again once idle for the claim
+        idle time, until it was delivered max attempts times. Errors other than
+        SMTP and connection errors are not retried.
+
+        Args:
+            message_id: The stream id of the email.
+            fields: The fields of the email.
+            deliveries: The number of deliveries of the email, this one included.
+
+        """
+        try:
+            await asyncio.to_thread(self._mailer.send, **fields)
+        except (smtplib.SMTPException, OSError) as e:
+            logger.warning(f"Email {message_id} delivery {deliveries} failed: {e}")
+            self._mailer.close()
+
+            if deliveries < smtp_settings.max_attempts:
+                return
+
+            error = str(e)
+        except Exception as e:
+            logger.opt(exception=e).error(f"Email {message_id} can not be delivered")
+            self._mailer.close()
+            error = repr(e)
+        else:
+            await ack_email(message_id=message_id)
+            return
+
+        logger.error(f"Email {message_id} moved to the dead letter stream")
+        await dead_letter_email(message_id=message_id, fields=fields, error=error)
+
+    async def process(self, block: int | None = None) -> int:
+        """Deliver a batch of stale and new emails.
+
+        Args:
+            block: The milliseconds to wait for new emails.
+
+        Returns:
+            The number of processed emails.
+
+        """
+        messages = await claim_stale_emails(
+            consumer=self.consumer,
+            count=smtp_settings.batch_size,
+            min_idle_time=smtp_settings.claim_idle_time * 1000,
+        )
+        if not messages:
+            messages = [
+                (message_id, fields, 1)
+                for message_id, fields in await read_emails(
+                    consumer=self.consumer, count=smtp_settings.batch_size, block=block
+                )
+            ]
+
+        for message_id, fields, deliveries in messages:
+            await self._deliver(
+                message_id=message_id, fields=fields, deliveries=deliveries
+            )
+
+        return len(messages)
+
+    async def run(self, block: int = 5000, retry_delay: float = 1.0) -> None:
+        """Deliver emails until cancelled.
+
+        Args:
+            block: The milliseconds to wait for new emails per read.
+            retry_delay: The delay before reading again after an error.
+
+        """
+        try:
+            while True:
+                try:
+                    await create_email_group()
+                    while True:
+                        await self.process(block=block)
+                except RedisError as e:
+                    logger.warning(f"Email outbox read failed: {e}")
+                    await asyncio.sleep(retry_delay)
+                except Exception as e:
+                    logger.opt(exception=e).error("Email worker failed")
+                    await asyncio.sleep(retry_delay)
+        finally:
+            self._mailer.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(EmailWorker(consumer=socket.gethostname()).run())